@@ -0,0 +1,346 @@
+# crypto_v3_alerts.py
+import requests
+import json
+import time
+import os
+import argparse
+from bisect import bisect_left, bisect_right, insort
+
+from crypto_v3_backfill import load_history
+from crypto_v3_exchanges import HyperliquidAdapter
+
+# REAL-TIME ALERT ENGINE - threshold and crossover triggers
+#
+# Run with:  python crypto_v3_alerts.py --rules alert_rules.json --interval 60
+#
+# Rules are plain dicts, for example:
+#   {"id": "avax-pump", "symbol": "AVAX", "metric": "change_24h", "op": "above", "value": 10}
+#   {"symbol": "*", "metric": "rsi", "op": "crosses_above", "value": 70}
+#   {"symbol": "BTC", "metric": "funding_rate", "transform": "abs", "op": "above", "value": 0.0005}
+#   {"symbol": "ETH", "metric": "open_interest", "transform": "change_pct", "op": "above", "value": 15}
+#
+# "above"/"below" fire when the value moves past the threshold, including the
+# first tick it is seen there. "crosses_above"/"crosses_below" need a previous
+# value. Either way a rule only fires again after the value has gone back
+# across the threshold and its cooldown has passed.
+
+TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
+TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+
+OPS = {
+    'above': ('up', False),
+    'crosses_above': ('up', True),
+    'below': ('down', False),
+    'crosses_below': ('down', True),
+}
+TRANSFORMS = (None, 'abs', 'change_pct')
+DEFAULT_COOLDOWN = 3600
+TELEGRAM_MESSAGE_LIMIT = 4000   # Telegram rejects messages over 4096 characters
+DAY = 86400
+
+
+def send_to_telegram(message):
+    """Sends message to Telegram"""
+    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    payload = {
+        'chat_id': TELEGRAM_CHAT_ID,
+        'text': message,
+        'parse_mode': 'Markdown'
+    }
+    try:
+        response = requests.post(url, json=payload, timeout=10)
+        response.raise_for_status()
+        print("✅ Message sent to Telegram!")
+    except Exception as e:
+        print(f"❌ Telegram error: {e}")
+
+
+def compile_rules(rules):
+    """Builds the rule index: symbol -> (metric, transform) -> direction -> sorted thresholds
+
+    Identical rules (same symbol, metric, transform, op and value) share one
+    slot so they can only produce one alert per crossing.
+    """
+    index = {}
+    for i, rule in enumerate(rules):
+        if rule['op'] not in OPS:
+            raise ValueError(f"Unknown alert op {rule['op']!r} in rule {rule.get('id', i)}")
+        transform = rule.get('transform')
+        if transform not in TRANSFORMS:
+            raise ValueError(f"Unknown alert transform {transform!r} in rule {rule.get('id', i)}")
+
+        direction, needs_previous = OPS[rule['op']]
+        symbol = rule.get('symbol', '*').upper()
+        threshold = float(rule['value'])
+        slot_key = (symbol, rule['metric'], transform, rule['op'], threshold)
+
+        book = index.setdefault(symbol, {}).setdefault((rule['metric'], transform), {})
+        thresholds, slots = book.setdefault(direction, ([], {}))
+        if threshold not in slots:
+            insort(thresholds, threshold)
+            slots[threshold] = []
+        existing = next((slot for slot in slots[threshold] if slot['key'] == slot_key), None)
+        if existing:
+            existing['ids'].append(rule.get('id', f"rule-{i}"))
+            continue
+        slots[threshold].append({
+            'key': slot_key,
+            'ids': [rule.get('id', f"rule-{i}")],
+            'needs_previous': needs_previous,
+            'cooldown': rule.get('cooldown', DEFAULT_COOLDOWN),
+            'message': rule.get('message'),
+        })
+    return index
+
+
+class AlertEngine:
+    """Evaluates ticks against a compiled rule index, keeping per-symbol state"""
+
+    def __init__(self, rules):
+        self.index = compile_rules(rules)
+        self.previous = {}
+        self.last_fired = {}
+        # Finished daily closes per coin id, see load_daily_closes
+        self.closes = {}
+
+    def process_tick(self, symbol, metrics, now=None):
+        """Checks one symbol's fresh metrics, returns the alerts that fired"""
+        now = now or time.time()
+        symbol = symbol.upper()
+        books = [self.index.get(symbol, {}), self.index.get('*', {})]
+        alerts = []
+
+        for (metric, transform) in set().union(*books):
+            if metrics.get(metric) is None:
+                continue
+            current = self.derive(symbol, metric, transform, metrics[metric])
+            if current is None:
+                continue
+            state_key = (symbol, metric, transform)
+            previous = self.previous.get(state_key)
+            self.previous[state_key] = current
+
+            for book in books:
+                if (metric, transform) in book:
+                    alerts += self.match(symbol, book[(metric, transform)], previous, current, now)
+        return alerts
+
+    def derive(self, symbol, metric, transform, value):
+        """Applies a rule transform, change_pct needs the last raw value"""
+        if transform == 'abs':
+            return abs(value)
+        if transform == 'change_pct':
+            raw_key = (symbol, metric, 'raw')
+            last = self.previous.get(raw_key)
+            self.previous[raw_key] = value
+            if not last:
+                return None
+            return (value - last) / abs(last) * 100
+        return value
+
+    def match(self, symbol, book, previous, current, now):
+        """Finds thresholds crossed between previous and current with two bisects"""
+        fired = []
+        for direction, (thresholds, slots) in book.items():
+            if direction == 'up':
+                # Crossed upwards: previous <= threshold < current
+                low = bisect_left(thresholds, previous) if previous is not None else 0
+                high = bisect_left(thresholds, current)
+            else:
+                # Crossed downwards: current < threshold <= previous
+                low = bisect_right(thresholds, current)
+                high = bisect_right(thresholds, previous) if previous is not None else len(thresholds)
+
+            for threshold in thresholds[low:high]:
+                for slot in slots[threshold]:
+                    if slot['needs_previous'] and previous is None:
+                        continue
+                    cooldown_key = (symbol, slot['key'])
+                    if now - self.last_fired.get(cooldown_key, float('-inf')) < slot['cooldown']:
+                        continue
+                    self.last_fired[cooldown_key] = now
+                    fired.append({
+                        'symbol': symbol,
+                        'rule_ids': slot['ids'],
+                        'metric': slot['key'][1],
+                        'transform': slot['key'][2],
+                        'op': slot['key'][3],
+                        'threshold': threshold,
+                        'value': current,
+                        'message': slot['message'],
+                    })
+        return fired
+
+
+def calculate_rsi(closes, period=14):
+    """Wilder RSI over a list of closing prices"""
+    if len(closes) <= period:
+        return None
+    gains = losses = 0.0
+    for i in range(1, period + 1):
+        change = closes[i] - closes[i - 1]
+        gains += max(change, 0)
+        losses += max(-change, 0)
+    avg_gain, avg_loss = gains / period, losses / period
+    for i in range(period + 1, len(closes)):
+        change = closes[i] - closes[i - 1]
+        avg_gain = (avg_gain * (period - 1) + max(change, 0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-change, 0)) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def load_daily_closes(coin_id, cache):
+    """Finished daily closes from the backfill store, read once per coin per UTC day
+
+    Today's stored bucket is still moving, so it is dropped and the caller's
+    live price stands in for it.
+    """
+    today = (int(time.time()) // DAY) * DAY
+    cached = cache.get(coin_id)
+    if cached and cached[0] == today:
+        return cached[1]
+    history = load_history(coin_id, 'daily')
+    closes = [
+        close for ts, close in zip(history['timestamp'][-101:], history['price'][-101:])
+        if ts < today and close is not None
+    ][-100:]
+    cache[coin_id] = (today, closes)
+    return closes
+
+
+def market_ticks(data, closes_cache=None):
+    """Turns a /coins/markets snapshot into (symbol, metrics) ticks
+
+    RSI uses the finished daily closes from the backfill store with the live
+    price as today's close, so it is only present for coins that have been
+    backfilled. CoinGecko symbols are not unique; only the first (largest)
+    coin per symbol is kept so per-symbol state never mixes two coins.
+    """
+    closes_cache = {} if closes_cache is None else closes_cache
+    ticks = []
+    seen = set()
+    for coin in data:
+        symbol = coin['symbol'].upper()
+        if symbol in seen:
+            continue
+        seen.add(symbol)
+        price = coin['current_price']
+        closes = load_daily_closes(coin['id'], closes_cache)
+        ticks.append((symbol, {
+            'price': price,
+            'change_24h': coin['price_change_percentage_24h'],
+            'volume': coin['total_volume'],
+            'rsi': calculate_rsi(closes + [price]) if closes and price is not None else None,
+        }))
+    return ticks
+
+
+def fetch_hyperliquid_ticks(symbols):
+    """Pulls funding and open interest for the given symbols from Hyperliquid
+
+    Uses the shared adapter, so 1000-unit perps (kPEPE, kSHIB, ...) come back
+    under their base symbol and match the same rules as the spot feed.
+    """
+    try:
+        tickers = HyperliquidAdapter().fetch_tickers(symbols)
+    except Exception as e:
+        print(f"Warning: Could not fetch Hyperliquid data: {e}")
+        return []
+
+    return [(symbol, {
+        'funding_rate': ticker['funding_rate'],
+        'open_interest': ticker['open_interest'],
+        'mark_price': ticker['price'],
+    }) for symbol, ticker in tickers.items()]
+
+
+def fetch_market_snapshot(pages=1):
+    """Fetches the CoinGecko markets snapshot the daily report uses"""
+    data = []
+    for page in range(1, pages + 1):
+        params = {
+            'vs_currency': 'usd',
+            'order': 'market_cap_desc',
+            'per_page': 250,
+            'page': page,
+            'sparkline': False,
+            'price_change_percentage': '24h'
+        }
+        try:
+            response = requests.get(COINGECKO_MARKETS_URL, params=params, timeout=20)
+            response.raise_for_status()
+            data += response.json()
+        except Exception as e:
+            print(f"Warning: Could not fetch markets page {page}: {e}")
+    return data
+
+
+def escape_markdown(text):
+    """Escapes Telegram Markdown entities so '_' in names can't break the message"""
+    for char in ('_', '*', '`', '['):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
+def format_alert(alert):
+    """One alert line; metric names go in backticks, rule text is escaped"""
+    symbol = escape_markdown(alert['symbol'])
+    if alert['message']:
+        return f"🚨 *{symbol}* {escape_markdown(alert['message'])} (`{alert['value']:.4g}`)"
+    metric = alert['metric'] if not alert['transform'] else f"{alert['metric']} {alert['transform']}"
+    return f"🚨 *{symbol}* `{metric}` {alert['op'].replace('_', ' ')} {alert['threshold']:g} (now `{alert['value']:.4g}`)"
+
+
+def split_message(lines, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Packs lines into messages that stay under Telegram's size limit"""
+    messages = []
+    current = ""
+    for line in lines:
+        if current and len(current) + len(line) + 1 > limit:
+            messages.append(current)
+            current = ""
+        current += ("\n" if current else "") + line[:limit]
+    if current:
+        messages.append(current)
+    return messages
+
+
+def run_alert_loop(rules, interval=60, pages=1, hyperliquid=True):
+    """Polls the feeds every interval seconds and sends fired alerts to Telegram"""
+    engine = AlertEngine(rules)
+    # Symbols named in rules are polled on Hyperliquid even outside the CoinGecko pages
+    symbols = set(engine.index) - {'*'}
+    print(f"🔔 Alert engine running with {len(rules)} rules, every {interval}s")
+
+    while True:
+        started = time.time()
+        ticks = market_ticks(fetch_market_snapshot(pages), engine.closes)
+        if hyperliquid:
+            ticks += fetch_hyperliquid_ticks(symbols | {symbol for symbol, _ in ticks})
+
+        alerts = []
+        for symbol, metrics in ticks:
+            alerts += engine.process_tick(symbol, metrics, now=started)
+
+        for message in split_message([format_alert(alert) for alert in alerts]):
+            send_to_telegram(message)
+            print(message)
+
+        time.sleep(max(0, interval - (time.time() - started)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the real-time alert engine")
+    parser.add_argument('--rules', default='alert_rules.json', help="JSON file with a list of rules")
+    parser.add_argument('--interval', type=int, default=60, help="Seconds between polls")
+    parser.add_argument('--pages', type=int, default=1, help="CoinGecko pages of 250 coins")
+    parser.add_argument('--no-hyperliquid', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.rules) as f:
+        rules = json.load(f)
+    run_alert_loop(rules, args.interval, args.pages, not args.no_hyperliquid)
@@ -0,0 +1,327 @@
+# crypto_v3_backfill.py
+import requests
+import json
+import time
+import os
+import argparse
+import threading
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# HISTORICAL BACKFILL - market_chart history for the coin universe
+#
+# Run with:  python crypto_v3_backfill.py --top 200 --days 365 --intraday-days 90
+#
+# History is downloaded in fixed, epoch-aligned chunks so overlapping runs map
+# to the same chunk keys. Finished chunks are recorded in a checkpoint file and
+# are never downloaded again, so an interrupted backfill just picks up where it
+# stopped.
+
+COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
+DATA_DIR = os.environ.get('CRYPTO_DATA_DIR', 'data')
+HISTORY_DIR = os.path.join(DATA_DIR, 'history')
+CHECKPOINT_FILE = os.path.join(DATA_DIR, 'backfill_checkpoint.json')
+
+DAY = 86400
+HOUR = 3600
+
+# CoinGecko picks granularity from the requested span:
+# 2-90 days -> hourly points, >90 days -> daily points
+INTERVALS = {
+    'daily': {'chunk_seconds': 365 * DAY, 'bucket_seconds': DAY},
+    'hourly': {'chunk_seconds': 30 * DAY, 'bucket_seconds': HOUR},
+}
+
+HISTORY_COLUMNS = ['price', 'market_cap', 'total_volume']
+
+# market_chart response key for each stored column
+CHART_KEYS = {'price': 'prices', 'market_cap': 'market_caps', 'total_volume': 'total_volumes'}
+
+
+class RateLimiter:
+    """Spaces out API calls across threads to stay under a calls/minute budget"""
+
+    def __init__(self, calls_per_minute):
+        self.min_interval = 60.0 / calls_per_minute
+        self.next_call = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_call - now
+            self.next_call = max(now, self.next_call) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+    def backoff(self, seconds):
+        """Pushes every thread back after a 429 from the API"""
+        with self.lock:
+            self.next_call = max(self.next_call, time.monotonic() + seconds)
+
+
+def fetch_universe(top=200):
+    """Fetches the top N coin ids by market cap from CoinGecko"""
+    coin_ids = []
+    page = 1
+    while len(coin_ids) < top:
+        params = {
+            'vs_currency': 'usd',
+            'order': 'market_cap_desc',
+            # Pages are offset by per_page, so it has to stay the same on every page
+            'per_page': 250,
+            'page': page,
+            'sparkline': False
+        }
+        response = requests.get(f"{COINGECKO_BASE_URL}/coins/markets", params=params, timeout=20)
+        response.raise_for_status()
+        data = response.json()
+        if not data:
+            break
+        coin_ids += [coin['id'] for coin in data]
+        page += 1
+    return coin_ids[:top]
+
+
+def plan_chunks(coin_id, interval, start, end):
+    """Splits [start, end) into epoch-aligned chunks for one coin
+
+    Chunk boundaries are aligned so runs with different windows share chunks,
+    but the first chunk is clamped to start: nothing before the requested
+    window is downloaded. The clamped start is part of the key.
+    """
+    chunk_seconds = INTERVALS[interval]['chunk_seconds']
+    chunks = []
+    chunk_start = (start // chunk_seconds) * chunk_seconds
+    while chunk_start < end:
+        chunk_end = chunk_start + chunk_seconds
+        fetch_start = max(chunk_start, start)
+        chunks.append({
+            'key': f"{coin_id}:{interval}:{fetch_start}:{chunk_end}",
+            'coin_id': coin_id,
+            'interval': interval,
+            'start': fetch_start,
+            'end': min(chunk_end, end),
+            # The chunk still growing at the head is re-fetched every run
+            'complete': chunk_end <= end,
+        })
+        chunk_start = chunk_end
+    return chunks
+
+
+def chunk_done(chunk, completed_starts):
+    """A chunk is done when the same aligned chunk was finished from an earlier start"""
+    done_start = completed_starts.get((chunk['coin_id'], chunk['interval'], chunk['key'].rsplit(':', 1)[1]))
+    return done_start is not None and done_start <= chunk['start']
+
+
+def completed_starts(completed):
+    """Earliest finished start per (coin, interval, chunk end) from the checkpoint keys"""
+    starts = {}
+    for key in completed:
+        coin_id, interval, start, end = key.rsplit(':', 3)
+        slot = (coin_id, interval, end)
+        starts[slot] = min(int(start), starts.get(slot, int(start)))
+    return starts
+
+
+def load_checkpoint():
+    """Loads the set of finished chunk keys"""
+    if not os.path.exists(CHECKPOINT_FILE):
+        return set()
+    with open(CHECKPOINT_FILE) as f:
+        return set(json.load(f).get('completed', []))
+
+
+def save_checkpoint(completed):
+    """Writes finished chunk keys atomically so a crash never corrupts the file"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_path = CHECKPOINT_FILE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'completed': sorted(completed)}, f)
+    os.replace(tmp_path, CHECKPOINT_FILE)
+
+
+def retry_after_seconds(value, default=60):
+    """Seconds to wait from a Retry-After header, which is either seconds or an HTTP date"""
+    if not value:
+        return default
+    try:
+        return max(0, int(value))
+    except ValueError:
+        pass
+    try:
+        return max(0, int(parsedate_to_datetime(value).timestamp() - time.time()))
+    except (TypeError, ValueError):
+        return default
+
+
+def fetch_market_chart_range(coin_id, start, end, limiter, retries=5):
+    """Downloads one market_chart/range window, retrying on rate limits"""
+    url = f"{COINGECKO_BASE_URL}/coins/{coin_id}/market_chart/range"
+    params = {'vs_currency': 'usd', 'from': start, 'to': end}
+
+    for attempt in range(retries):
+        limiter.wait()
+        try:
+            response = requests.get(url, params=params, timeout=30)
+            if response.status_code == 429:
+                retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                print(f"Warning: Rate limited on {coin_id}, backing off {retry_after}s")
+                limiter.backoff(retry_after)
+                continue
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            if attempt == retries - 1:
+                raise
+            print(f"Warning: Retrying {coin_id} after error: {e}")
+            limiter.backoff(2 ** attempt)
+
+    raise RuntimeError(f"Gave up on {coin_id} after {retries} rate-limited attempts")
+
+
+def history_path(coin_id, interval):
+    return os.path.join(HISTORY_DIR, interval, f"{coin_id}.json")
+
+
+def load_history(coin_id, interval='daily'):
+    """Loads stored history as columns: timestamp, price, market_cap, total_volume, sampled_at
+
+    timestamp is the bucket start. The values are the bucket's close: the last
+    point at or before the bucket end, sampled at sampled_at (seconds).
+    """
+    path = history_path(coin_id, interval)
+    if not os.path.exists(path):
+        return {'timestamp': [], 'sampled_at': [], **{column: [] for column in HISTORY_COLUMNS}}
+    with open(path) as f:
+        history = json.load(f)
+    history.setdefault('sampled_at', [0] * len(history['timestamp']))
+    return history
+
+
+def merge_into_store(coin_id, interval, chart):
+    """Merges a market_chart response into the columnar store, one row per bucket
+
+    Every bucket holds its close: the last point at or before the bucket end.
+    Daily chunks longer than 90 days come back as 00:00 points and shorter ones
+    as hourly points; a 00:00 point closes the previous day, so both land on the
+    same value. A bucket is only overwritten by a point sampled later.
+    """
+    bucket_seconds = INTERVALS[interval]['bucket_seconds']
+    history = load_history(coin_id, interval)
+
+    # Index existing rows by bucket so overlapping downloads replace, not append
+    rows = {}
+    for i, ts in enumerate(history['timestamp']):
+        rows[ts] = {column: history[column][i] for column in HISTORY_COLUMNS + ['sampled_at']}
+
+    points = {}
+    for column in HISTORY_COLUMNS:
+        for ts_ms, value in chart.get(CHART_KEYS[column], []):
+            sampled_at = int(ts_ms // 1000)
+            # A point exactly on a boundary is the close of the bucket before it
+            bucket = ((sampled_at - 1) // bucket_seconds) * bucket_seconds
+            point = points.setdefault((bucket, sampled_at), {'sampled_at': sampled_at})
+            point[column] = value
+
+    for (bucket, sampled_at), point in sorted(points.items()):
+        row = rows.get(bucket)
+        if row is None or sampled_at >= row['sampled_at']:
+            rows[bucket] = {**dict.fromkeys(HISTORY_COLUMNS), **(row or {}), **point}
+
+    timestamps = sorted(rows)
+    merged = {'timestamp': timestamps}
+    for column in HISTORY_COLUMNS + ['sampled_at']:
+        merged[column] = [rows[ts][column] for ts in timestamps]
+
+    path = history_path(coin_id, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(merged, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return len(points)
+
+
+def backfill_coin(coin_id, chunks, limiter, completed, checkpoint_lock):
+    """Downloads all pending chunks of one coin in order
+
+    A failed chunk does not stop the later ones; it stays out of the
+    checkpoint and is retried on the next run.
+    """
+    downloaded = 0
+    failed = 0
+    for chunk in chunks:
+        try:
+            chart = fetch_market_chart_range(coin_id, chunk['start'], chunk['end'], limiter)
+        except Exception as e:
+            print(f"Warning: {chunk['key']} failed: {e}")
+            failed += 1
+            continue
+        merge_into_store(coin_id, chunk['interval'], chart)
+        downloaded += 1
+        if chunk['complete']:
+            with checkpoint_lock:
+                completed.add(chunk['key'])
+                save_checkpoint(completed)
+    if failed:
+        raise RuntimeError(f"{failed} of {len(chunks)} chunks failed ({downloaded} downloaded)")
+    return downloaded
+
+
+def run_backfill(coin_ids, days=365, intraday_days=90, workers=4, calls_per_minute=30):
+    """Backfills daily and hourly history for every coin, resuming from the checkpoint"""
+    now = int(time.time())
+    completed = load_checkpoint()
+    done_starts = completed_starts(completed)
+    checkpoint_lock = threading.Lock()
+    limiter = RateLimiter(calls_per_minute)
+
+    pending = {}
+    skipped = 0
+    for coin_id in coin_ids:
+        chunks = plan_chunks(coin_id, 'daily', now - days * DAY, now)
+        if intraday_days:
+            chunks += plan_chunks(coin_id, 'hourly', now - intraday_days * DAY, now)
+        todo = [chunk for chunk in chunks if not chunk_done(chunk, done_starts)]
+        skipped += len(chunks) - len(todo)
+        if todo:
+            pending[coin_id] = todo
+
+    total = sum(len(chunks) for chunks in pending.values())
+    print(f"📦 Backfill: {total} chunks to download, {skipped} already done, {len(pending)} coins")
+
+    # Coins run in parallel; chunks of one coin run in order so each store file has one writer
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(backfill_coin, coin_id, chunks, limiter, completed, checkpoint_lock): coin_id
+            for coin_id, chunks in pending.items()
+        }
+        for future in as_completed(futures):
+            coin_id = futures[future]
+            try:
+                count = future.result()
+                print(f"✅ {coin_id}: {count} chunks")
+            except Exception as e:
+                print(f"❌ {coin_id}: {e}")
+                failed.append(coin_id)
+
+    if failed:
+        print(f"⚠️ {len(failed)} coins failed, re-run to resume: {', '.join(failed)}")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill CoinGecko history into the local store")
+    parser.add_argument('--coins', help="Comma separated CoinGecko ids (default: top N by market cap)")
+    parser.add_argument('--top', type=int, default=200, help="Universe size when --coins is not given")
+    parser.add_argument('--days', type=int, default=365, help="Days of daily history")
+    parser.add_argument('--intraday-days', type=int, default=90, help="Days of hourly history (0 to skip)")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--calls-per-minute', type=int, default=30)
+    args = parser.parse_args()
+
+    coins = args.coins.split(',') if args.coins else fetch_universe(args.top)
+    run_backfill(coins, args.days, args.intraday_days, args.workers, args.calls_per_minute)
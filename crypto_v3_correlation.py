@@ -0,0 +1,208 @@
+# crypto_v3_correlation.py
+import time
+import os
+import argparse
+from collections import deque
+
+import numpy as np
+
+from crypto_v3_backfill import load_history, DATA_DIR, DAY
+
+# CROSS-ASSET ANALYTICS - rolling correlation, beta and relative strength
+#
+# Run with:  python crypto_v3_correlation.py --coins bitcoin,ethereum,avalanche-2 --window 30
+#
+# Returns come from the backfill store (crypto_v3_backfill.py). Every refresh
+# rebuilds the T x N window of return rows from the store, so days filled in
+# or revised by a later backfill are picked up, and the N x N sums come from
+# the window with four matrix products. Missing prices are handled pairwise:
+# each pair only uses the rows where both coins have a return.
+
+BENCHMARKS = ['bitcoin', 'ethereum']
+MIN_PERIODS = 10
+
+
+class RollingCorrelation:
+    """Pairwise-complete rolling correlation over the last `window` return rows"""
+
+    def __init__(self, coin_ids, window=30):
+        self.coin_ids = list(coin_ids)
+        self.window = window
+        self.rows = deque(maxlen=window)
+        self.sums = None
+
+    def load(self, returns):
+        """Replaces the window with the last rows of a T x N returns matrix"""
+        self.rows = deque(np.asarray(returns, dtype=float), maxlen=self.window)
+        self.sums = None
+
+    def update(self, row):
+        """Adds one return row, the oldest drops out once the window is full"""
+        self.rows.append(np.asarray(row, dtype=float))
+        self.sums = None
+
+    def pair_sums(self):
+        """count, sum_x, sum_xx, sum_xy as N x N matrices, rebuilt after any change
+
+        count[i, j] is the rows where both coins have a return; sum_x[i, j] and
+        sum_xx[i, j] sum x_i and x_i^2 over those rows.
+        """
+        if self.sums is None:
+            returns = np.array(self.rows).reshape(-1, len(self.coin_ids))
+            valid = (~np.isnan(returns)).astype(float)
+            x = np.nan_to_num(returns)
+            self.sums = (valid.T @ valid, x.T @ valid, (x * x).T @ valid, x.T @ x)
+        return self.sums
+
+    def moments(self, min_periods=MIN_PERIODS):
+        """Pairwise covariance and the matching variances of each side"""
+        count, sum_x, sum_xx, sum_xy = self.pair_sums()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            count = np.where(count >= min_periods, count, np.nan)
+            mean_i = sum_x / count
+            mean_j = sum_x.T / count
+            cov = sum_xy / count - mean_i * mean_j
+            var_i = sum_xx / count - mean_i ** 2
+            var_j = sum_xx.T / count - mean_j ** 2
+        return cov, var_i, var_j
+
+    def correlation(self, min_periods=MIN_PERIODS):
+        cov, var_i, var_j = self.moments(min_periods)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.sqrt(var_i * var_j)
+        return np.clip(corr, -1, 1)
+
+    def beta(self, benchmark, min_periods=MIN_PERIODS):
+        """Beta of every coin against one benchmark coin"""
+        b = self.coin_ids.index(benchmark)
+        cov, _, var_j = self.moments(min_periods)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return cov[:, b] / var_j[:, b]
+
+    def relative_return(self, benchmark, min_periods=MIN_PERIODS):
+        """Summed log return of each coin minus the benchmark's, over the rows both have
+
+        NaN where the pair has fewer than min_periods rows in common.
+        """
+        b = self.coin_ids.index(benchmark)
+        count, sum_x, _, _ = self.pair_sums()
+        relative = sum_x[:, b] - sum_x[b, :]
+        return np.where(count[:, b] >= min_periods, relative, np.nan)
+
+
+def load_price_matrix(coin_ids, days, interval='daily'):
+    """Aligns stored daily closes into a T x N matrix (NaN where a coin has no row)
+
+    Today's bucket is still moving, so only finished days are used.
+    """
+    today = (int(time.time()) // DAY) * DAY
+    histories = [load_history(coin_id, interval) for coin_id in coin_ids]
+    timestamps = {ts for history in histories for ts in history['timestamp'] if ts < today}
+    timestamps = sorted(timestamps)[-(days + 1):]
+    position = {ts: i for i, ts in enumerate(timestamps)}
+
+    prices = np.full((len(timestamps), len(coin_ids)), np.nan)
+    for j, history in enumerate(histories):
+        for ts, price in zip(history['timestamp'], history['price']):
+            if ts in position and price:
+                prices[position[ts], j] = price
+    return timestamps, prices
+
+
+def log_returns(prices):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.diff(np.log(prices), axis=0)
+
+
+def refresh_cross_asset(coin_ids, window=30, live_prices=None):
+    """Builds the rolling window from the backfill store and returns the analytics
+
+    live_prices (coin id -> price) adds an intraday row on top of the last
+    finished day.
+    """
+    _, prices = load_price_matrix(coin_ids, window + 1)
+    rolling = RollingCorrelation(coin_ids, window)
+    rolling.load(log_returns(prices))
+
+    if live_prices and len(prices):
+        live = np.array([live_prices.get(coin_id, np.nan) for coin_id in coin_ids], dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rolling.update(np.log(live / prices[-1]))
+
+    return cross_asset_analytics(rolling)
+
+
+def cross_asset_analytics(rolling):
+    """Correlation matrix, beta vs BTC/ETH and relative-strength ranking"""
+    analytics = {
+        'coin_ids': rolling.coin_ids,
+        'correlation': rolling.correlation(),
+        'beta': {},
+    }
+    for benchmark in BENCHMARKS:
+        if benchmark in rolling.coin_ids:
+            analytics['beta'][benchmark] = rolling.beta(benchmark)
+
+    analytics['relative_strength'] = []
+    if 'bitcoin' in rolling.coin_ids:
+        relative = rolling.relative_return('bitcoin')
+        order = np.argsort(-np.nan_to_num(relative, nan=-np.inf))
+        analytics['relative_strength'] = [
+            (rolling.coin_ids[i], float(relative[i]))
+            for i in order if not np.isnan(relative[i]) and rolling.coin_ids[i] != 'bitcoin'
+        ]
+    return analytics
+
+
+def format_cross_asset_report(analytics, top=5, labels=None):
+    """Telegram section with the strongest/weakest coins vs BTC and their beta
+
+    labels maps coin ids to the names shown (the report uses symbols).
+    """
+    ranking = analytics['relative_strength']
+    if not ranking:
+        return "\n*Relative Strength (vs BTC):*\nNot enough history yet\n"
+    labels = labels or {}
+    beta_btc = analytics['beta'].get('bitcoin')
+    position = {coin_id: i for i, coin_id in enumerate(analytics['coin_ids'])}
+
+    def line(coin_id, strength):
+        text = f"{labels.get(coin_id, coin_id)} {(np.exp(strength) - 1) * 100:+.2f}% vs BTC"
+        if beta_btc is not None and not np.isnan(beta_btc[position[coin_id]]):
+            text += f" | β {beta_btc[position[coin_id]]:.2f}"
+        return text + "\n"
+
+    report = "\n*Relative Strength (vs BTC):*\n"
+    if beta_btc is not None:
+        btc = position['bitcoin']
+        alts = [i for coin_id, i in position.items() if coin_id not in BENCHMARKS]
+        corr_btc = analytics['correlation'][alts, btc]
+        if alts and not np.all(np.isnan(corr_btc)):
+            report += f"Alts vs BTC: median corr {np.nanmedian(corr_btc):.2f} | median β {np.nanmedian(beta_btc[alts]):.2f}\n"
+    for coin_id, strength in ranking[:top]:
+        report += line(coin_id, strength)
+    # Only coins not already listed as strongest
+    weakest = ranking[top:][-top:][::-1]
+    if weakest:
+        report += "\n*Weakest vs BTC:*\n"
+        for coin_id, strength in weakest:
+            report += line(coin_id, strength)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling cross-asset correlation from the backfill store")
+    parser.add_argument('--coins', help="Comma separated CoinGecko ids (default: every backfilled coin)")
+    parser.add_argument('--window', type=int, default=30, help="Rolling window in days")
+    args = parser.parse_args()
+
+    if args.coins:
+        coins = args.coins.split(',')
+    else:
+        daily_dir = os.path.join(DATA_DIR, 'history', 'daily')
+        coins = sorted(name[:-5] for name in os.listdir(daily_dir) if name.endswith('.json'))
+
+    started = time.time()
+    analytics = refresh_cross_asset(coins, args.window)
+    print(format_cross_asset_report(analytics))
+    print(f"{len(coins)}x{len(coins)} matrix in {time.time() - started:.2f}s")
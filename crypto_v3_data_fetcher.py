@@ -4,12 +4,16 @@ import json
 import time
 import os
 
+from crypto_v3_snapshot import delta_report, save_run_state
+from crypto_v3_correlation import refresh_cross_asset, format_cross_asset_report
+from crypto_v3_exchanges import HyperliquidAdapter, fetch_all_venues, merge_by_symbol, format_venue_report, book_imbalance
+
 # Telegram configuration from environment variables
 TELEGRAM_BOT_TOKEN = os.environ['TELEGRAM_BOT_TOKEN']  
 TELEGRAM_CHAT_ID = os.environ['TELEGRAM_CHAT_ID']
 
 def send_to_telegram(message):
-    """Sends message to Telegram"""
+    """Sends message to Telegram, returns True once it was accepted"""
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {
         'chat_id': TELEGRAM_CHAT_ID,
@@ -20,8 +24,10 @@ def send_to_telegram(message):
         response = requests.post(url, json=payload, timeout=10)
         response.raise_for_status()
         print("✅ Message sent to Telegram!")
+        return True
     except Exception as e:
         print(f"❌ Telegram error: {e}")
+        return False
 
 def fetch_fear_greed_index():
     """Fetches Fear & Greed Index from Alternative.me"""
@@ -78,6 +84,22 @@ def fetch_crypto_data():
         fng = fetch_fear_greed_index()
         btc_dom = fetch_btc_dominance()
         
+        # Your watchlist (edit this list!)
+        watchlist = ['DOT', 'CAKE', 'TIA', 'CRV', 'AVAX', 'ALGO', 'ARB', 'CHZ', 'THETA', '1INCH', 'ICP']
+        
+        # Between full digests only send what changed since the last run.
+        # The run state is only saved once Telegram took the message.
+        send_full_report, delta_message, run_state = delta_report(data, watchlist, fng, btc_dom)
+        if not send_full_report:
+            if delta_message:
+                if send_to_telegram(delta_message):
+                    save_run_state(*run_state)
+                print(delta_message)
+            else:
+                save_run_state(*run_state)
+                print("No changes since last run - nothing sent")
+            return
+        
         # Build message
         message = f"🔷 *V3 DATA READY*\n"
         message += f"`{time.strftime('%Y-%m-%d %H:%M:%S UTC')}`\n\n"
@@ -112,10 +134,6 @@ def fetch_crypto_data():
                 if momentum_count >= 5:  # Limit to 5 for brevity
                     break
         
-        # Your watchlist (edit this list!)
-        watchlist = ['DOT', 'CAKE', 'TIA', 'CRV', 'AVAX', 'ALGO', 'ARB', 'CHZ', 'THETA', '1INCH', 'ICP']
-       
-        
         message += f"\n*Your Watchlist:*\n"
         watchlist_found = 0
         for coin in data[20:200]:
@@ -132,11 +150,30 @@ def fetch_crypto_data():
                 message += f"{symbol} {price_str} ({change_24h:+.2f}%)\n"
                 watchlist_found += 1
         
+        # Per-venue volume and order flow for the Top 5 and watchlist
+        venue_symbols = [coin['symbol'].upper() for coin in data[:5]] + watchlist
+        try:
+            venue_data = merge_by_symbol(fetch_all_venues(venue_symbols))
+            message += format_venue_report(venue_data, venue_symbols)
+        except Exception as e:
+            print(f"Warning: Could not fetch exchange data: {e}")
+        
+        # Cross-asset correlation, beta and relative strength (needs the backfill store)
+        try:
+            analytics = refresh_cross_asset(
+                sorted(coin['id'] for coin in data),
+                live_prices={coin['id']: coin['current_price'] for coin in data}
+            )
+            message += format_cross_asset_report(analytics, labels={coin['id']: coin['symbol'].upper() for coin in data})
+        except Exception as e:
+            print(f"Warning: Could not compute cross-asset analytics: {e}")
+        
         # Add command prompt
         message += "\n*Next step:*\nForward this to AI with:\n`Run V3 analysis on this data`"
         
         # Send to Telegram
-        send_to_telegram(message)
+        if send_to_telegram(message):
+            save_run_state(*run_state)
         
         # Also print for local log
         print(message)
@@ -466,98 +503,66 @@ import json
 import time
 
 def fetch_hyperliquid_data(symbols):
-    """Pull institutional data from Hyperliquid"""
+    """Pull institutional data from Hyperliquid in the normalized exchange schema"""
     
     hyperliquid_data = {}
+    adapter = HyperliquidAdapter()
     
-    # Hyperliquid API endpoints
-    BASE_URL = "https://api.hyperliquid.xyz"
+    try:
+        # One request covers price, volume, funding and open interest for every perp
+        tickers = adapter.fetch_tickers(symbols)
+    except Exception as e:
+        print(f"Warning: Could not fetch Hyperliquid data: {e}")
+        tickers = {}
     
     for symbol in symbols:
-        try:
-            # 1. Real-time order book and perpetual data
-            order_book_url = f"{BASE_URL}/info"
-            order_book_payload = {
-                "type": "metaAndAssetContext",
-                "coin": symbol
-            }
-            
-            response = requests.post(order_book_url, json=order_book_payload, timeout=10)
-            response.raise_for_status()
-            hyper_data = response.json()
-            
-            # 2. Funding rates and open interest
-            funding_url = f"{BASE_URL}/info"
-            funding_payload = {
-                "type": "clearinghouseState",
-                "coin": symbol
-            }
-            
-            funding_response = requests.post(funding_url, json=funding_payload, timeout=10)
-            funding_data = funding_response.json()
-            
-            # Extract institutional data
-            hyperliquid_data[symbol] = {
-                'order_book': hyper_data,
-                'funding_rates': funding_data,
-                'institutional_metrics': calculate_hyperliquid_metrics(hyper_data, funding_data)
-            }
-            
-        except Exception as e:
-            print(f"Warning: Could not fetch Hyperliquid data for {symbol}: {e}")
+        ticker = tickers.get(symbol.upper())
+        if not ticker:
             # Fallback to CoinGecko data
             hyperliquid_data[symbol] = None
+            continue
+        
+        try:
+            book = adapter.fetch_order_book(symbol)
+        except Exception as e:
+            print(f"Warning: Could not fetch Hyperliquid order book for {symbol}: {e}")
+            book = None
+        
+        hyperliquid_data[symbol] = {
+            'ticker': ticker,
+            'book': book,
+            'institutional_metrics': calculate_hyperliquid_metrics(ticker, book)
+        }
     
     return hyperliquid_data
 
-def calculate_hyperliquid_metrics(order_book_data, funding_data):
-    """Calculate institutional metrics from Hyperliquid data"""
+def calculate_hyperliquid_metrics(ticker, book):
+    """Calculate institutional metrics from a normalized Hyperliquid ticker and book"""
     
     metrics = {}
     
     try:
         # 1. Order Flow Analysis (CVD from order book)
-        if 'orderBook' in order_book_data:
-            bids = order_book_data['orderBook'].get('bids', [])
-            asks = order_book_data['orderBook'].get('asks', [])
-            
-            # Calculate CVD from order book
-            total_bids = sum([bid[1] for bid in bids[:10]])  # Top 10 bids
-            total_asks = sum([ask[1] for ask in asks[:10]])  # Top 10 asks
-            
-            cvd_hyper = (total_bids - total_asks) / (total_bids + total_asks) * 100
+        if book:
+            cvd_hyper = book_imbalance(book)  # Top 10 levels
             metrics['CVD_Hyperliquid'] = {
                 'value': cvd_hyper,
                 'interpretation': "Hyperliquid order flow - positive = more bids"
             }
         
         # 2. Funding Rates (institutional sentiment)
-        if 'fundingRates' in funding_data:
-            funding_rate = funding_data['fundingRates'].get('rate', 0)
-            metrics['Funding_Rate'] = {
-                'value': funding_rate,
-                'interpretation': f"Funding rate: {funding_rate:.4f} (positive = longs pay shorts)"
-            }
+        funding_rate = ticker['funding_rate']
+        metrics['Funding_Rate'] = {
+            'value': funding_rate,
+            'interpretation': f"Funding rate: {funding_rate:.4f} (positive = longs pay shorts)"
+        }
         
         # 3. Open Interest (institutional positioning)
-        if 'openInterest' in funding_data:
-            oi = funding_data['openInterest']
-            metrics['Open_Interest'] = {
-                'value': oi,
-                'interpretation': f"Open interest: {oi:,.0f} (higher = more institutional interest)"
-            }
-        
-        # 4. Liquidation Data (institutional behavior)
-        if 'liquidations' in funding_data:
-            liquidations = funding_data['liquidations']
-            long_liq = liquidations.get('longs', 0)
-            short_liq = liquidations.get('shorts', 0)
-            
-            metrics['Liquidations'] = {
-                'longs': long_liq,
-                'shorts': short_liq,
-                'interpretation': f"Liquidations: Longs: ${long_liq:,.0f}, Shorts: ${short_liq:,.0f}"
-            }
+        oi = ticker['open_interest']
+        metrics['Open_Interest'] = {
+            'value': oi,
+            'interpretation': f"Open interest: {oi:,.0f} (higher = more institutional interest)"
+        }
         
     except Exception as e:
         print(f"Warning: Could not calculate Hyperliquid metrics: {e}")
@@ -614,99 +619,67 @@ send_to_telegram(hyper_analysis)
 # HYPERLIQUID INTEGRATION - Add these functions
 
 def fetch_hyperliquid_data(symbols):
-    """Pull institutional data from Hyperliquid"""
+    """Pull institutional data from Hyperliquid in the normalized exchange schema"""
     
     hyperliquid_data = {}
+    adapter = HyperliquidAdapter()
     
-    # Hyperliquid API endpoints
-    BASE_URL = "https://api.hyperliquid.xyz"
+    try:
+        # One request covers price, volume, funding and open interest for every perp
+        tickers = adapter.fetch_tickers(symbols)
+    except Exception as e:
+        print(f"Warning: Could not fetch Hyperliquid data: {e}")
+        tickers = {}
     
     for symbol in symbols:
-        try:
-            # 1. Real-time order book and perpetual data
-            order_book_url = f"{BASE_URL}/info"
-            order_book_payload = {
-                "type": "metaAndAssetContext",
-                "coin": symbol
-            }
-            
-            response = requests.post(order_book_url, json=order_book_payload, timeout=10)
-            response.raise_for_status()
-            hyper_data = response.json()
-            
-            # 2. Funding rates and open interest
-            funding_url = f"{BASE_URL}/info"
-            funding_payload = {
-                "type": "clearinghouseState",
-                "coin": symbol
-            }
-            
-            funding_response = requests.post(funding_url, json=funding_payload, timeout=10)
-            funding_data = funding_response.json()
-            
-            # Extract institutional data
-            hyperliquid_data[symbol] = {
-                'order_book': hyper_data,
-                'funding_rates': funding_data,
-                'institutional_metrics': calculate_hyperliquid_metrics(hyper_data, funding_data)
-            }
-            
-        except Exception as e:
-            print(f"Warning: Could not fetch Hyperliquid data for {symbol}: {e}")
+        ticker = tickers.get(symbol.upper())
+        if not ticker:
             # Fallback to CoinGecko data
             hyperliquid_data[symbol] = None
+            continue
+        
+        try:
+            book = adapter.fetch_order_book(symbol)
+        except Exception as e:
+            print(f"Warning: Could not fetch Hyperliquid order book for {symbol}: {e}")
+            book = None
+        
+        hyperliquid_data[symbol] = {
+            'ticker': ticker,
+            'book': book,
+            'institutional_metrics': calculate_hyperliquid_metrics(ticker, book)
+        }
     
     return hyperliquid_data
 
-def calculate_hyperliquid_metrics(order_book_data, funding_data):
-    """Calculate institutional metrics from Hyperliquid data"""
+def calculate_hyperliquid_metrics(ticker, book):
+    """Calculate institutional metrics from a normalized Hyperliquid ticker and book"""
     
     metrics = {}
     
     try:
         # 1. Order Flow Analysis (CVD from order book)
-        if 'orderBook' in order_book_data:
-            bids = order_book_data['orderBook'].get('bids', [])
-            asks = order_book_data['orderBook'].get('asks', [])
-            
-            # Calculate CVD from order book
-            total_bids = sum([bid[1] for bid in bids[:10]])  # Top 10 bids
-            total_asks = sum([ask[1] for ask in asks[:10]])  # Top 10 asks
-            
-            cvd_hyper = (total_bids - total_asks) / (total_bids + total_asks) * 100
+        if book:
+            cvd_hyper = book_imbalance(book)  # Top 10 levels
             metrics['CVD_Hyperliquid'] = {
                 'value': cvd_hyper,
                 'interpretation': "Hyperliquid order flow - positive = more bids"
             }
         
         # 2. Funding Rates (institutional sentiment)
-        if 'fundingRates' in funding_data:
-            funding_rate = funding_data['fundingRates'].get('rate', 0)
-            metrics['Funding_Rate'] = {
-                'value': funding_rate,
-                'interpretation': f"Funding rate: {funding_rate:.4f} (positive = longs pay shorts)"
-            }
+        funding_rate = ticker['funding_rate']
+        metrics['Funding_Rate'] = {
+            'value': funding_rate,
+            'interpretation': f"Funding rate: {funding_rate:.4f} (positive = longs pay shorts)"
+        }
         
         # 3. Open Interest (institutional positioning)
-        if 'openInterest' in funding_data:
-            oi = funding_data['openInterest']
-            metrics['Open_Interest'] = {
-                'value': oi,
-                'interpretation': f"Open interest: {oi:,.0f} (higher = more institutional interest)"
-            }
+        oi = ticker['open_interest']
+        metrics['Open_Interest'] = {
+            'value': oi,
+            'interpretation': f"Open interest: {oi:,.0f} (higher = more institutional interest)"
+        }
         
-        # 4. Liquidation Data (institutional behavior)
-        if 'liquidations' in funding_data:
-            liquidations = funding_data['liquidations']
-            long_liq = liquidations.get('longs', 0)
-            short_liq = liquidations.get('shorts', 0)
-            
-            metrics['Liquidations'] = {
-                'longs': long_liq,
-                'shorts': short_liq,
-                'interpretation': f"Liquidations: Longs: ${long_liq:,.0f}, Shorts: ${short_liq:,.0f}"
-            }
-    
     except Exception as e:
         print(f"Warning: Could not calculate Hyperliquid metrics: {e}")
         metrics = {}
@@ -0,0 +1,569 @@
+# crypto_v3_exchanges.py
+import requests
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# MULTI-EXCHANGE ADAPTERS - one normalized schema for every venue
+#
+# Run with:  python crypto_v3_exchanges.py --symbols BTC,ETH,AVAX
+#            python crypto_v3_exchanges.py --symbols BTC,ETH --stub   (local stub servers)
+#
+# Every adapter returns the same plain dicts, whatever the venue sends:
+#   ticker: {'venue', 'symbol', 'price', 'bid', 'ask', 'volume_base', 'volume_quote', 'change_pct', 'timestamp'}
+#           (bid/ask are None when the venue has no quote; perp venues add 'funding_rate', 'open_interest')
+#   candle: {'venue', 'symbol', 'open_time', 'open', 'high', 'low', 'close', 'volume'}
+#   book:   {'venue', 'symbol', 'bids': [(price, size)], 'asks': [(price, size)], 'timestamp'}
+# Symbols are base assets ('BTC'); each adapter maps them to its own pair names.
+# Timestamps are milliseconds.
+
+QUOTE = 'USDT'
+REQUEST_TIMEOUT = 10
+
+
+def to_float(value):
+    """float() for optional venue fields, None for '' or missing values"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ExchangeAdapter:
+    """Base adapter, subclasses implement the three fetchers for one venue"""
+
+    name = None
+    base_url = None
+
+    def __init__(self, base_url=None, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url or self.base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        # time.monotonic() by which every request of this adapter must be done
+        self.deadline = None
+
+    def request_timeout(self):
+        """Per-request timeout, cut short by the adapter's overall deadline"""
+        if self.deadline is None:
+            return self.timeout
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{self.name} is out of time")
+        return min(self.timeout, remaining)
+
+    def get(self, path, params=None):
+        response = self.session.get(f"{self.base_url}{path}", params=params, timeout=self.request_timeout())
+        response.raise_for_status()
+        return response.json()
+
+    def to_venue(self, symbol):
+        return f"{symbol.upper()}{QUOTE}"
+
+    def from_venue(self, venue_symbol):
+        """Returns the base asset, or None for pairs outside our quote"""
+        if venue_symbol.endswith(QUOTE):
+            return venue_symbol[:-len(QUOTE)]
+        return None
+
+    def fetch_tickers(self, symbols):
+        raise NotImplementedError
+
+    def fetch_candles(self, symbol, interval='1h', limit=100):
+        raise NotImplementedError
+
+    def fetch_order_book(self, symbol, depth=20):
+        raise NotImplementedError
+
+
+class BinanceAdapter(ExchangeAdapter):
+    name = 'binance'
+    base_url = "https://api.binance.com"
+
+    def fetch_tickers(self, symbols):
+        wanted = {symbol.upper() for symbol in symbols}
+        tickers = {}
+        for raw in self.get("/api/v3/ticker/24hr"):
+            symbol = self.from_venue(raw['symbol'])
+            if symbol in wanted:
+                try:
+                    tickers[symbol] = {
+                        'venue': self.name,
+                        'symbol': symbol,
+                        'price': float(raw['lastPrice']),
+                        'bid': to_float(raw.get('bidPrice')),
+                        'ask': to_float(raw.get('askPrice')),
+                        'volume_base': float(raw['volume']),
+                        'volume_quote': float(raw['quoteVolume']),
+                        'change_pct': float(raw['priceChangePercent']),
+                        'timestamp': int(raw['closeTime']),
+                    }
+                except (KeyError, ValueError, TypeError) as e:
+                    print(f"Warning: {self.name} ticker for {symbol} skipped: {e}")
+        return tickers
+
+    def fetch_candles(self, symbol, interval='1h', limit=100):
+        params = {'symbol': self.to_venue(symbol), 'interval': interval, 'limit': limit}
+        return [{
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'open_time': int(row[0]),
+            'open': float(row[1]),
+            'high': float(row[2]),
+            'low': float(row[3]),
+            'close': float(row[4]),
+            'volume': float(row[5]),
+        } for row in self.get("/api/v3/klines", params)]
+
+    def fetch_order_book(self, symbol, depth=20):
+        raw = self.get("/api/v3/depth", {'symbol': self.to_venue(symbol), 'limit': depth})
+        return {
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'bids': [(float(price), float(size)) for price, size in raw['bids']],
+            'asks': [(float(price), float(size)) for price, size in raw['asks']],
+            'timestamp': int(time.time() * 1000),
+        }
+
+
+class BybitAdapter(ExchangeAdapter):
+    name = 'bybit'
+    base_url = "https://api.bybit.com"
+    intervals = {'1m': '1', '5m': '5', '15m': '15', '1h': '60', '4h': '240', '1d': 'D'}
+
+    def fetch_tickers(self, symbols):
+        wanted = {symbol.upper() for symbol in symbols}
+        response = self.get("/v5/market/tickers", {'category': 'spot'})
+        tickers = {}
+        for raw in response['result']['list']:
+            symbol = self.from_venue(raw['symbol'])
+            if symbol in wanted:
+                try:
+                    tickers[symbol] = {
+                        'venue': self.name,
+                        'symbol': symbol,
+                        'price': float(raw['lastPrice']),
+                        'bid': to_float(raw.get('bid1Price')),
+                        'ask': to_float(raw.get('ask1Price')),
+                        'volume_base': float(raw['volume24h']),
+                        'volume_quote': float(raw['turnover24h']),
+                        'change_pct': float(raw['price24hPcnt']) * 100,
+                        'timestamp': int(response['time']),
+                    }
+                except (KeyError, ValueError, TypeError) as e:
+                    print(f"Warning: {self.name} ticker for {symbol} skipped: {e}")
+        return tickers
+
+    def fetch_candles(self, symbol, interval='1h', limit=100):
+        params = {'category': 'spot', 'symbol': self.to_venue(symbol),
+                  'interval': self.intervals[interval], 'limit': limit}
+        rows = self.get("/v5/market/kline", params)['result']['list']
+        # Bybit returns newest first
+        return [{
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'open_time': int(row[0]),
+            'open': float(row[1]),
+            'high': float(row[2]),
+            'low': float(row[3]),
+            'close': float(row[4]),
+            'volume': float(row[5]),
+        } for row in reversed(rows)]
+
+    def fetch_order_book(self, symbol, depth=20):
+        params = {'category': 'spot', 'symbol': self.to_venue(symbol), 'limit': depth}
+        raw = self.get("/v5/market/orderbook", params)['result']
+        return {
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'bids': [(float(price), float(size)) for price, size in raw['b']],
+            'asks': [(float(price), float(size)) for price, size in raw['a']],
+            'timestamp': int(raw['ts']),
+        }
+
+
+class OkxAdapter(ExchangeAdapter):
+    name = 'okx'
+    base_url = "https://www.okx.com"
+    intervals = {'1m': '1m', '5m': '5m', '15m': '15m', '1h': '1H', '4h': '4H', '1d': '1Dutc'}
+
+    def to_venue(self, symbol):
+        return f"{symbol.upper()}-{QUOTE}"
+
+    def from_venue(self, venue_symbol):
+        base, _, quote = venue_symbol.partition('-')
+        return base if quote == QUOTE else None
+
+    def fetch_tickers(self, symbols):
+        wanted = {symbol.upper() for symbol in symbols}
+        tickers = {}
+        for raw in self.get("/api/v5/market/tickers", {'instType': 'SPOT'})['data']:
+            symbol = self.from_venue(raw['instId'])
+            if symbol in wanted:
+                try:
+                    price, open_24h = float(raw['last']), float(raw['open24h'])
+                    tickers[symbol] = {
+                        'venue': self.name,
+                        'symbol': symbol,
+                        'price': price,
+                        'bid': to_float(raw.get('bidPx')),
+                        'ask': to_float(raw.get('askPx')),
+                        'volume_base': float(raw['vol24h']),
+                        # volCcy24h is in quote currency for spot pairs
+                        'volume_quote': float(raw['volCcy24h']),
+                        'change_pct': (price - open_24h) / open_24h * 100 if open_24h else 0,
+                        'timestamp': int(raw['ts']),
+                    }
+                except (KeyError, ValueError, TypeError) as e:
+                    print(f"Warning: {self.name} ticker for {symbol} skipped: {e}")
+        return tickers
+
+    def fetch_candles(self, symbol, interval='1h', limit=100):
+        params = {'instId': self.to_venue(symbol), 'bar': self.intervals[interval], 'limit': limit}
+        rows = self.get("/api/v5/market/candles", params)['data']
+        # OKX returns newest first
+        return [{
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'open_time': int(row[0]),
+            'open': float(row[1]),
+            'high': float(row[2]),
+            'low': float(row[3]),
+            'close': float(row[4]),
+            'volume': float(row[5]),
+        } for row in reversed(rows)]
+
+    def fetch_order_book(self, symbol, depth=20):
+        raw = self.get("/api/v5/market/books", {'instId': self.to_venue(symbol), 'sz': depth})['data'][0]
+        return {
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'bids': [(float(level[0]), float(level[1])) for level in raw['bids']],
+            'asks': [(float(level[0]), float(level[1])) for level in raw['asks']],
+            'timestamp': int(raw['ts']),
+        }
+
+
+class HyperliquidAdapter(ExchangeAdapter):
+    """Hyperliquid perps, everything goes through POST /info"""
+
+    name = 'hyperliquid'
+    base_url = "https://api.hyperliquid.xyz"
+    interval_ms = {'1m': 60000, '5m': 300000, '15m': 900000, '1h': 3600000, '4h': 14400000, '1d': 86400000}
+    # Low-priced perps are listed per 1000 units
+    aliases = {'kPEPE': 'PEPE', 'kSHIB': 'SHIB', 'kBONK': 'BONK', 'kFLOKI': 'FLOKI'}
+
+    def info(self, payload):
+        response = self.session.post(f"{self.base_url}/info", json=payload, timeout=self.request_timeout())
+        response.raise_for_status()
+        return response.json()
+
+    def to_venue(self, symbol):
+        venue_names = {base: name for name, base in self.aliases.items()}
+        return venue_names.get(symbol.upper(), symbol.upper())
+
+    def from_venue(self, venue_symbol):
+        return self.aliases.get(venue_symbol, venue_symbol.upper())
+
+    def fetch_tickers(self, symbols):
+        wanted = {symbol.upper() for symbol in symbols}
+        meta, contexts = self.info({'type': 'metaAndAssetCtxs'})
+        now = int(time.time() * 1000)
+        tickers = {}
+        for asset, ctx in zip(meta['universe'], contexts):
+            symbol = self.from_venue(asset['name'])
+            if symbol in wanted:
+                try:
+                    price, prev = float(ctx['markPx']), float(ctx['prevDayPx'])
+                    impact = ctx.get('impactPxs') or [price, price]
+                    tickers[symbol] = {
+                        'venue': self.name,
+                        'symbol': symbol,
+                        'price': price,
+                        'bid': to_float(impact[0]),
+                        'ask': to_float(impact[1]),
+                        'volume_base': float(ctx['dayBaseVlm']),
+                        'volume_quote': float(ctx['dayNtlVlm']),
+                        'change_pct': (price - prev) / prev * 100 if prev else 0,
+                        'timestamp': now,
+                        'funding_rate': float(ctx['funding']),
+                        'open_interest': float(ctx['openInterest']),
+                    }
+                except (KeyError, ValueError, TypeError) as e:
+                    print(f"Warning: {self.name} ticker for {symbol} skipped: {e}")
+        return tickers
+
+    def fetch_candles(self, symbol, interval='1h', limit=100):
+        end = int(time.time() * 1000)
+        start = end - self.interval_ms[interval] * limit
+        req = {'coin': self.to_venue(symbol), 'interval': interval, 'startTime': start, 'endTime': end}
+        return [{
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'open_time': int(row['t']),
+            'open': float(row['o']),
+            'high': float(row['h']),
+            'low': float(row['l']),
+            'close': float(row['c']),
+            'volume': float(row['v']),
+        } for row in self.info({'type': 'candleSnapshot', 'req': req})]
+
+    def fetch_order_book(self, symbol, depth=20):
+        raw = self.info({'type': 'l2Book', 'coin': self.to_venue(symbol)})
+        bids, asks = raw['levels']
+        return {
+            'venue': self.name,
+            'symbol': symbol.upper(),
+            'bids': [(float(level['px']), float(level['sz'])) for level in bids[:depth]],
+            'asks': [(float(level['px']), float(level['sz'])) for level in asks[:depth]],
+            'timestamp': int(raw['time']),
+        }
+
+
+ADAPTERS = {
+    adapter.name: adapter
+    for adapter in (BinanceAdapter, BybitAdapter, OkxAdapter, HyperliquidAdapter)
+}
+
+# Spot venues merged by default; Hyperliquid perp notional and impact prices
+# would skew spot volume, VWAP and best quotes, so it has to be asked for
+SPOT_VENUES = ['binance', 'bybit', 'okx']
+
+
+def fetch_venue(adapter, symbols, depth=20, with_books=True):
+    """Pulls tickers (and books) for one venue, run inside a worker thread
+
+    Order books stop once the adapter's deadline has passed; the tickers and
+    books fetched so far are still returned.
+    """
+    started = time.time()
+    tickers = adapter.fetch_tickers(symbols)
+    books = {}
+    if with_books:
+        for symbol in tickers:
+            try:
+                books[symbol] = adapter.fetch_order_book(symbol, depth)
+            except TimeoutError as e:
+                print(f"Warning: {e}, skipping remaining order books")
+                break
+            except Exception as e:
+                print(f"Warning: {adapter.name} order book for {symbol} failed: {e}")
+    return {'tickers': tickers, 'books': books, 'latency': time.time() - started}
+
+
+def fetch_all_venues(symbols, venues=None, deadline=15, depth=20, with_books=True, base_urls=None):
+    """Fetches every venue concurrently and returns whatever finished before the deadline
+
+    Each venue runs in a daemon thread with the deadline as its overall time
+    budget. A venue that errors or is still running at the deadline is left
+    out, and its thread can't keep the process alive, so one slow exchange
+    never holds up the run.
+    """
+    venues = venues or SPOT_VENUES
+    base_urls = base_urls or {}
+    stop_at = time.monotonic() + deadline
+    results = {}
+    errors = {}
+
+    def worker(venue):
+        adapter = ADAPTERS[venue](base_urls.get(venue))
+        adapter.deadline = stop_at
+        try:
+            results[venue] = fetch_venue(adapter, symbols, depth, with_books)
+        except Exception as e:
+            errors[venue] = e
+
+    threads = {venue: threading.Thread(target=worker, args=(venue,), daemon=True) for venue in venues}
+    for thread in threads.values():
+        thread.start()
+    for thread in threads.values():
+        thread.join(max(0, stop_at - time.monotonic()))
+
+    finished = {}
+    for venue, thread in threads.items():
+        if thread.is_alive():
+            print(f"Warning: {venue} missed the {deadline}s deadline, skipping")
+        elif venue in errors:
+            print(f"Warning: Could not fetch {venue}: {errors[venue]}")
+        else:
+            finished[venue] = results[venue]
+    return finished
+
+
+def book_imbalance(book, levels=10):
+    """Order book imbalance over the top levels, positive = more bids"""
+    total_bids = sum(size for _, size in book['bids'][:levels])
+    total_asks = sum(size for _, size in book['asks'][:levels])
+    if total_bids + total_asks == 0:
+        return 0
+    return (total_bids - total_asks) / (total_bids + total_asks) * 100
+
+
+def merge_by_symbol(results):
+    """Combines per-venue tickers and books into one record per symbol"""
+    merged = {}
+    for venue, result in results.items():
+        for symbol, ticker in result['tickers'].items():
+            entry = merged.setdefault(symbol, {'symbol': symbol, 'venues': {}})
+            entry['venues'][venue] = {
+                'ticker': ticker,
+                'book_imbalance': book_imbalance(result['books'][symbol]) if symbol in result['books'] else None,
+            }
+
+    for entry in merged.values():
+        tickers = [venue['ticker'] for venue in entry['venues'].values()]
+        volume_quote = sum(ticker['volume_quote'] for ticker in tickers)
+        entry['volume_quote'] = volume_quote
+        entry['price'] = (
+            sum(ticker['price'] * ticker['volume_quote'] for ticker in tickers) / volume_quote
+            if volume_quote else tickers[0]['price']
+        )
+        bids = [ticker['bid'] for ticker in tickers if ticker['bid'] is not None]
+        asks = [ticker['ask'] for ticker in tickers if ticker['ask'] is not None]
+        entry['best_bid'] = max(bids) if bids else None
+        entry['best_ask'] = min(asks) if asks else None
+        entry['volume_share'] = {
+            ticker['venue']: ticker['volume_quote'] / volume_quote if volume_quote else 0
+            for ticker in tickers
+        }
+        # Volume-weighted order flow across venues that returned a book
+        weighted = [(venue['book_imbalance'], venue['ticker']['volume_quote'])
+                    for venue in entry['venues'].values() if venue['book_imbalance'] is not None]
+        weight = sum(volume for _, volume in weighted)
+        entry['book_imbalance'] = sum(value * volume for value, volume in weighted) / weight if weight else None
+    return merged
+
+
+def format_venue_report(merged, symbols):
+    """Telegram section with per-venue volume share and order flow"""
+    report = "\n*Multi-Venue Flow:*\n"
+    for symbol in symbols:
+        entry = merged.get(symbol.upper())
+        if not entry:
+            continue
+        shares = ", ".join(f"{venue} {share * 100:.0f}%"
+                           for venue, share in sorted(entry['volume_share'].items(), key=lambda item: -item[1]))
+        imbalance = f"{entry['book_imbalance']:+.1f}%" if entry['book_imbalance'] is not None else "N/A"
+        report += f"{entry['symbol']} ${entry['volume_quote'] / 1e6:,.1f}M vol | book {imbalance} | {shares}\n"
+    return report
+
+
+# LOCAL STUB SERVERS - canned venue responses for offline runs and checks
+
+def stub_payloads(venue, symbols, now_ms):
+    """Builds canned responses in each venue's own wire format"""
+    rows = []
+    for i, symbol in enumerate(symbols):
+        price = 100.0 * (i + 1)
+        rows.append((symbol.upper(), price))
+
+    def book(price):
+        return ([[f"{price - k * 0.1:.2f}", f"{1 + k:.1f}"] for k in range(20)],
+                [[f"{price + k * 0.1:.2f}", f"{2 + k:.1f}"] for k in range(20)])
+
+    def candles(price):
+        return [[str(now_ms - k * 3600000), str(price), str(price + 1), str(price - 1), str(price), "10"]
+                for k in range(5)]
+
+    if venue == 'binance':
+        return {
+            '/api/v3/ticker/24hr': [{
+                'symbol': f"{symbol}{QUOTE}", 'lastPrice': str(price), 'bidPrice': str(price - 0.1),
+                'askPrice': str(price + 0.1), 'volume': "1000", 'quoteVolume': str(price * 1000),
+                'priceChangePercent': "2.5", 'closeTime': now_ms} for symbol, price in rows],
+            '/api/v3/klines': lambda q: [[int(row[0])] + row[1:] for row in candles(rows[0][1])][::-1],
+            '/api/v3/depth': lambda q: dict(zip(('bids', 'asks'), book(rows[0][1]))),
+        }
+    if venue == 'bybit':
+        return {
+            '/v5/market/tickers': {'time': now_ms, 'result': {'list': [{
+                'symbol': f"{symbol}{QUOTE}", 'lastPrice': str(price), 'bid1Price': str(price - 0.1),
+                'ask1Price': str(price + 0.1), 'volume24h': "500", 'turnover24h': str(price * 500),
+                'price24hPcnt': "0.025"} for symbol, price in rows]}},
+            '/v5/market/kline': lambda q: {'result': {'list': candles(rows[0][1])}},
+            '/v5/market/orderbook': lambda q: {'result': dict(zip(('b', 'a'), book(rows[0][1])), ts=now_ms)},
+        }
+    if venue == 'okx':
+        return {
+            '/api/v5/market/tickers': {'data': [{
+                'instId': f"{symbol}-{QUOTE}", 'last': str(price), 'bidPx': str(price - 0.1),
+                'askPx': str(price + 0.1), 'vol24h': "250", 'volCcy24h': str(price * 250),
+                'open24h': str(price / 1.025), 'ts': str(now_ms)} for symbol, price in rows]},
+            '/api/v5/market/candles': lambda q: {'data': candles(rows[0][1])},
+            '/api/v5/market/books': lambda q: {'data': [dict(zip(('bids', 'asks'), book(rows[0][1])), ts=str(now_ms))]},
+        }
+    if venue == 'hyperliquid':
+        adapter = HyperliquidAdapter()
+        return {
+            'metaAndAssetCtxs': [
+                {'universe': [{'name': adapter.to_venue(symbol)} for symbol, _ in rows]},
+                [{'markPx': str(price), 'prevDayPx': str(price / 1.025), 'impactPxs': [str(price - 0.1), str(price + 0.1)],
+                  'dayBaseVlm': "100", 'dayNtlVlm': str(price * 100), 'funding': "0.0001",
+                  'openInterest': "1000"} for symbol, price in rows]],
+            'l2Book': lambda q: {'time': now_ms, 'levels': [
+                [{'px': px, 'sz': sz, 'n': 1} for px, sz in side] for side in book(rows[0][1])]},
+            'candleSnapshot': lambda q: [
+                {'t': int(row[0]), 'o': row[1], 'h': row[2], 'l': row[3], 'c': row[4], 'v': row[5]}
+                for row in candles(rows[0][1])][::-1],
+        }
+    raise ValueError(f"No stub for venue {venue!r}")
+
+
+def serve_stub_exchange(venue, symbols, delay=0, port=0):
+    """Starts a local HTTP server speaking one venue's API, returns (server, base_url)
+
+    delay adds a sleep to every response to simulate a slow venue.
+    """
+    payloads = stub_payloads(venue, symbols, int(time.time() * 1000))
+
+    class Handler(BaseHTTPRequestHandler):
+        def respond(self, payload, query):
+            if payload is None:
+                self.send_error(404)
+                return
+            time.sleep(delay)
+            body = json.dumps(payload(query) if callable(payload) else payload).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            self.respond(payloads.get(url.path), parse_qs(url.query))
+
+        def do_POST(self):
+            query = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            self.respond(payloads.get(query.get('type')), query)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch and merge spot data from every exchange adapter")
+    parser.add_argument('--symbols', default='BTC,ETH', help="Comma separated base assets")
+    parser.add_argument('--venues', help=f"Comma separated subset of: {', '.join(ADAPTERS)} (default: {','.join(SPOT_VENUES)})")
+    parser.add_argument('--deadline', type=float, default=15, help="Seconds before slow venues are skipped")
+    parser.add_argument('--stub', action='store_true', help="Run against local stub servers")
+    args = parser.parse_args()
+
+    symbols = args.symbols.upper().split(',')
+    venues = args.venues.split(',') if args.venues else SPOT_VENUES
+    base_urls = {}
+    if args.stub:
+        for venue in venues:
+            _, base_urls[venue] = serve_stub_exchange(venue, symbols)
+
+    results = fetch_all_venues(symbols, venues, args.deadline, base_urls=base_urls)
+    for venue, result in results.items():
+        print(f"✅ {venue}: {len(result['tickers'])} tickers in {result['latency']:.2f}s")
+    print(format_venue_report(merge_by_symbol(results), symbols))
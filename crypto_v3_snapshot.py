@@ -0,0 +1,237 @@
+# crypto_v3_snapshot.py
+import json
+import time
+import os
+
+from crypto_v3_backfill import DATA_DIR
+from crypto_v3_alerts import market_ticks
+
+# RUN STATE + SNAPSHOT DIFFING - only report what changed since the last run
+#
+# Each run stores the computed snapshot (ranks, prices, RSI zones and the
+# Top 5 / High Momentum / Watchlist picks) in data/run_state.json. The next run
+# diffs against it and sends a short delta report instead of the full digest.
+# The full digest goes out once a day, on the first run at or after
+# FULL_REPORT_HOUR (08:00 UTC), so a late or skipped scheduled run still
+# gets it.
+
+RUN_STATE_FILE = os.path.join(DATA_DIR, 'run_state.json')
+FULL_REPORT_HOUR = int(os.environ.get('FULL_REPORT_HOUR', 8))
+DAY = 86400
+
+RANK_CHANGE_MIN = 3         # Positions moved before a rank change is reported
+WATCHLIST_MOVE_MIN = 3.0    # % price move since a watchlist coin was last reported
+
+
+def approx_rsi(change_24h):
+    """Same 24h-change mapping as calculate_rsi_from_data in the daily report"""
+    if abs(change_24h) > 10: return 85 if change_24h > 0 else 15
+    elif abs(change_24h) > 5: return 70 if change_24h > 0 else 30
+    elif abs(change_24h) > 2: return 55 if change_24h > 0 else 45
+    else: return 50
+
+
+def rsi_zone(rsi):
+    """Same zones as interpret_rsi in the daily report"""
+    if rsi is None: return None
+    if rsi > 70: return "OVERBOUGHT"
+    elif rsi > 60: return "HIGH"
+    elif rsi > 40: return "NEUTRAL"
+    elif rsi > 30: return "LOW"
+    else: return "OVERSOLD"
+
+
+def build_snapshot(data, watchlist, fng=None, btc_dom=None):
+    """Reduces a /coins/markets snapshot to what the reports are built from
+
+    RSI comes from the backfill store; coins without enough stored history
+    fall back to the report's 24h-change approximation. Like market_ticks,
+    only the first (largest) coin per symbol is kept.
+    """
+    rsi_by_symbol = {symbol: metrics['rsi'] for symbol, metrics in market_ticks(data)}
+
+    coins = {}
+    approximated = 0
+    for rank, coin in enumerate(data, 1):
+        symbol = coin['symbol'].upper()
+        if symbol in coins:
+            continue
+        change_24h = coin['price_change_percentage_24h'] or 0
+        rsi = rsi_by_symbol.get(symbol)
+        if rsi is None:
+            rsi = approx_rsi(change_24h)
+            approximated += 1
+        coins[symbol] = {
+            'rank': rank,
+            'price': coin['current_price'],
+            'change_24h': change_24h,
+            'rsi_zone': rsi_zone(rsi),
+        }
+
+    if approximated:
+        print(f"Warning: No stored history for {approximated} coins, using approximate RSI")
+
+    # Same selection rules as fetch_crypto_data
+    momentum = []
+    for coin in data[20:200]:
+        if abs(coin['price_change_percentage_24h'] or 0) > 5:
+            momentum.append(coin['symbol'].upper())
+            if len(momentum) >= 5:
+                break
+
+    return {
+        'timestamp': int(time.time()),
+        'macro': {'fng': fng, 'btc_dom': btc_dom},
+        'coins': coins,
+        'top5': [coin['symbol'].upper() for coin in data[:5]],
+        'momentum': momentum,
+        'watchlist': [coin['symbol'].upper() for coin in data[20:200] if coin['symbol'].upper() in watchlist],
+        # Price each watchlist coin was last reported at, carried forward by diff_snapshots
+        'watchlist_ref': {},
+    }
+
+
+def load_run_state():
+    if not os.path.exists(RUN_STATE_FILE):
+        return None
+    try:
+        with open(RUN_STATE_FILE) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read run state, sending full report: {e}")
+        return None
+
+
+def save_run_state(snapshot, last_full_report):
+    """Writes the snapshot atomically so an interrupted run keeps the old state"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    tmp_path = RUN_STATE_FILE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'snapshot': snapshot, 'last_full_report': last_full_report}, f)
+    os.replace(tmp_path, RUN_STATE_FILE)
+
+
+def diff_snapshots(previous, current):
+    """Computes what changed between two snapshots, empty lists when nothing did
+
+    Watchlist moves are measured from the last reported price, so slow drifts
+    still show up once they add up. This fills current['watchlist_ref'].
+    """
+    prev_coins, coins = previous['coins'], current['coins']
+    delta = {
+        'top5_in': [s for s in current['top5'] if s not in previous['top5']],
+        'top5_out': [s for s in previous['top5'] if s not in current['top5']],
+        'momentum_in': [s for s in current['momentum'] if s not in previous['momentum']],
+        'momentum_out': [s for s in previous['momentum'] if s not in current['momentum']],
+        'rank_changes': [],
+        'rsi_transitions': [],
+        'watchlist_moves': [],
+        'macro': None,
+    }
+
+    for symbol, coin in coins.items():
+        before = prev_coins.get(symbol)
+        if not before:
+            continue
+        if abs(before['rank'] - coin['rank']) >= RANK_CHANGE_MIN and min(before['rank'], coin['rank']) <= 50:
+            delta['rank_changes'].append((symbol, before['rank'], coin['rank']))
+        if before['rsi_zone'] and coin['rsi_zone'] and before['rsi_zone'] != coin['rsi_zone']:
+            delta['rsi_transitions'].append((symbol, before['rsi_zone'], coin['rsi_zone']))
+
+    for symbol in current['watchlist']:
+        price = coins[symbol]['price']
+        reference = previous.get('watchlist_ref', {}).get(symbol)
+        current['watchlist_ref'][symbol] = reference or price
+        if reference and price is not None:
+            move = (price - reference) / reference * 100
+            if abs(move) >= WATCHLIST_MOVE_MIN:
+                delta['watchlist_moves'].append((symbol, price, move))
+                current['watchlist_ref'][symbol] = price
+
+    prev_fng, fng = previous['macro'].get('fng') or {}, current['macro'].get('fng') or {}
+    sentiments = (prev_fng.get('sentiment'), fng.get('sentiment'))
+    if None not in sentiments and 'N/A' not in sentiments and sentiments[0] != sentiments[1]:
+        delta['macro'] = (prev_fng.get('sentiment'), fng.get('sentiment'), fng.get('value'))
+
+    delta['rank_changes'].sort(key=lambda change: change[2])
+    return delta
+
+
+def format_price(price):
+    return f"${price:.6f}" if price < 0.01 else f"${price:.2f}"
+
+
+def format_delta_report(delta, since):
+    """Builds the Telegram delta message, or None when nothing changed"""
+    sections = []
+
+    if delta['macro']:
+        before, after, value = delta['macro']
+        sections.append(f"*Macro:*\nFear & Greed: {before} → *{after}* ({value})\n")
+    if delta['top5_in'] or delta['top5_out']:
+        sections.append(f"*Top 5:*\nIn: {', '.join(delta['top5_in'])} | Out: {', '.join(delta['top5_out'])}\n")
+    if delta['momentum_in'] or delta['momentum_out']:
+        section = "*High Momentum (>5%):*\n"
+        if delta['momentum_in']:
+            section += f"New: {', '.join(delta['momentum_in'])}\n"
+        if delta['momentum_out']:
+            section += f"Dropped: {', '.join(delta['momentum_out'])}\n"
+        sections.append(section)
+    if delta['rank_changes']:
+        section = "*Rank Changes:*\n"
+        for symbol, before, after in delta['rank_changes'][:10]:
+            arrow = "⬆️" if after < before else "⬇️"
+            section += f"{arrow} {symbol} #{before} → #{after}\n"
+        sections.append(section)
+    if delta['rsi_transitions']:
+        section = "*RSI Zone Changes:*\n"
+        for symbol, before, after in delta['rsi_transitions'][:10]:
+            section += f"{symbol} {before} → {after}\n"
+        sections.append(section)
+    if delta['watchlist_moves']:
+        section = "*Your Watchlist:*\n"
+        for symbol, price, move in delta['watchlist_moves']:
+            section += f"{symbol} {format_price(price)} ({move:+.2f}% since last update)\n"
+        sections.append(section)
+
+    if not sections:
+        return None
+
+    message = f"🔷 *V3 UPDATE*\n"
+    message += f"`{time.strftime('%Y-%m-%d %H:%M:%S UTC')}` (changes since {time.strftime('%H:%M UTC', time.gmtime(since))})\n\n"
+    return message + "\n".join(sections)
+
+
+def delta_report(data, watchlist, fng=None, btc_dom=None):
+    """Returns (send_full_report, delta_message, run_state) for this run
+
+    The full report is due on the first run, when FULL_REPORT=1 is set, or on
+    the first run at or after today's FULL_REPORT_HOUR. Otherwise delta_message
+    is the delta report, or None when there is nothing worth sending.
+
+    Nothing is written here: the caller passes run_state to save_run_state
+    once the message went out, so a failed send is retried on the next run.
+    """
+    snapshot = build_snapshot(data, watchlist, fng, btc_dom)
+    state = load_run_state()
+    now = snapshot['timestamp']
+
+    # Most recent FULL_REPORT_HOUR slot that has already started
+    slot = (now // DAY) * DAY + FULL_REPORT_HOUR * 3600
+    if slot > now:
+        slot -= DAY
+
+    full_due = (
+        state is None
+        or os.environ.get('FULL_REPORT', '').lower() in ('1', 'true', 'yes')
+        or state['last_full_report'] < slot
+    )
+    if full_due:
+        snapshot['watchlist_ref'] = {
+            symbol: snapshot['coins'][symbol]['price']
+            for symbol in snapshot['watchlist'] if snapshot['coins'][symbol]['price'] is not None
+        }
+        return True, None, (snapshot, now)
+
+    message = format_delta_report(diff_snapshots(state['snapshot'], snapshot), state['snapshot']['timestamp'])
+    return False, message, (snapshot, state['last_full_report'])
@@ -0,0 +1,118 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_v3_alerts as alerts
+import crypto_v3_exchanges as exchanges
+
+
+def rule(op, value, metric='price', symbol='BTC', **extra):
+    return {'id': f"{op}-{value}", 'symbol': symbol, 'metric': metric, 'op': op, 'value': value, **extra}
+
+
+class MatchTest(unittest.TestCase):
+
+    def fired(self, engine, value, now, symbol='BTC', metric='price'):
+        return [alert['threshold'] for alert in engine.process_tick(symbol, {metric: value}, now=now)]
+
+    def test_up_crossing_boundaries(self):
+        engine = alerts.AlertEngine([rule('crosses_above', 100)])
+        self.assertEqual(self.fired(engine, 90, now=0), [])
+        # Landing exactly on the threshold is not a crossing yet
+        self.assertEqual(self.fired(engine, 100, now=1), [])
+        # Leaving it upwards is: previous <= threshold < current
+        self.assertEqual(self.fired(engine, 101, now=2), [100.0])
+
+    def test_down_crossing_boundaries(self):
+        engine = alerts.AlertEngine([rule('crosses_below', 100)])
+        self.assertEqual(self.fired(engine, 110, now=0), [])
+        self.assertEqual(self.fired(engine, 100, now=1), [])
+        # current < threshold <= previous
+        self.assertEqual(self.fired(engine, 99, now=2), [100.0])
+
+    def test_one_tick_crosses_several_thresholds(self):
+        engine = alerts.AlertEngine([rule('above', 100), rule('above', 105), rule('above', 120)])
+        self.fired(engine, 90, now=0)
+        self.assertEqual(sorted(self.fired(engine, 110, now=1)), [100.0, 105.0])
+
+    def test_above_fires_on_first_tick_crosses_needs_previous(self):
+        engine = alerts.AlertEngine([rule('above', 100), rule('crosses_above', 100)])
+        first = engine.process_tick('BTC', {'price': 150}, now=0)
+        self.assertEqual([alert['op'] for alert in first], ['above'])
+
+        engine = alerts.AlertEngine([rule('below', 100), rule('crosses_below', 100)])
+        first = engine.process_tick('BTC', {'price': 50}, now=0)
+        self.assertEqual([alert['op'] for alert in first], ['below'])
+
+    def test_staying_past_threshold_does_not_refire(self):
+        engine = alerts.AlertEngine([rule('above', 100, cooldown=0)])
+        self.assertEqual(self.fired(engine, 110, now=0), [100.0])
+        self.assertEqual(self.fired(engine, 120, now=10), [])
+
+    def test_cooldown_blocks_recross_until_it_passes(self):
+        engine = alerts.AlertEngine([rule('crosses_above', 100, cooldown=60)])
+        self.fired(engine, 90, now=0)
+        self.assertEqual(self.fired(engine, 110, now=1), [100.0])
+        self.fired(engine, 90, now=2)
+        self.assertEqual(self.fired(engine, 110, now=30), [])
+        self.fired(engine, 90, now=40)
+        self.assertEqual(self.fired(engine, 110, now=61), [100.0])
+
+    def test_identical_rules_share_one_alert(self):
+        engine = alerts.AlertEngine([rule('above', 100, id='a'), rule('above', 100, id='b')])
+        fired = engine.process_tick('BTC', {'price': 110}, now=0)
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(fired[0]['rule_ids'], ['a', 'b'])
+
+    def test_wildcard_and_symbol_rules_both_match(self):
+        engine = alerts.AlertEngine([rule('above', 100), rule('above', 90, symbol='*')])
+        self.assertEqual(sorted(self.fired(engine, 110, now=0)), [90.0, 100.0])
+        self.assertEqual(self.fired(engine, 110, now=0, symbol='ETH'), [90.0])
+
+    def test_change_pct_needs_a_previous_raw_value(self):
+        engine = alerts.AlertEngine([rule('above', 10, metric='open_interest', transform='change_pct')])
+        self.assertEqual(self.fired(engine, 1000, now=0, metric='open_interest'), [])
+        self.assertEqual(self.fired(engine, 1200, now=1, metric='open_interest'), [10.0])
+
+    def test_unknown_op_is_rejected(self):
+        with self.assertRaises(ValueError):
+            alerts.compile_rules([rule('between', 100)])
+
+
+class FormatTest(unittest.TestCase):
+
+    def alert(self, metric, message=None):
+        return {'symbol': 'AVAX', 'metric': metric, 'transform': None, 'op': 'crosses_above',
+                'threshold': 10.0, 'value': 12.0, 'message': message}
+
+    def test_metric_names_are_in_code_spans(self):
+        self.assertEqual(alerts.format_alert(self.alert('change_24h')),
+                         "🚨 *AVAX* `change_24h` crosses above 10 (now `12`)")
+
+    def test_rule_message_is_escaped(self):
+        line = alerts.format_alert(self.alert('funding_rate', message="funding_rate *spike*"))
+        self.assertIn("funding\\_rate \\*spike\\*", line)
+
+
+class HyperliquidTicksTest(unittest.TestCase):
+
+    def test_kpepe_ticks_use_base_symbol(self):
+        server, url = exchanges.serve_stub_exchange('hyperliquid', ['BTC', 'PEPE'])
+        self.addCleanup(server.shutdown)
+        with mock.patch.object(exchanges.HyperliquidAdapter, 'base_url', url):
+            ticks = dict(alerts.fetch_hyperliquid_ticks({'BTC', 'PEPE'}))
+
+        self.assertEqual(sorted(ticks), ['BTC', 'PEPE'])
+        self.assertEqual(ticks['PEPE']['funding_rate'], 0.0001)
+        self.assertEqual(ticks['PEPE']['open_interest'], 1000.0)
+
+        engine = alerts.AlertEngine([rule('above', 500, metric='open_interest', symbol='PEPE')])
+        self.assertEqual(len(engine.process_tick('PEPE', ticks['PEPE'], now=0)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
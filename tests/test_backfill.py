@@ -0,0 +1,164 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_v3_backfill as backfill
+
+DAY = backfill.DAY
+HOUR = backfill.HOUR
+YEAR = 365 * DAY
+
+
+class PlanChunksTest(unittest.TestCase):
+
+    def test_first_chunk_is_clamped_to_start(self):
+        start, end = 2 * YEAR + 100 * DAY, 3 * YEAR + 10 * DAY
+        chunks = backfill.plan_chunks('bitcoin', 'daily', start, end)
+
+        self.assertEqual([chunk['start'] for chunk in chunks], [start, 3 * YEAR])
+        self.assertEqual([chunk['end'] for chunk in chunks], [3 * YEAR, end])
+        self.assertEqual(chunks[0]['key'], f"bitcoin:daily:{start}:{3 * YEAR}")
+        self.assertEqual([chunk['complete'] for chunk in chunks], [True, False])
+
+    def test_aligned_start_keeps_full_chunk(self):
+        chunks = backfill.plan_chunks('bitcoin', 'hourly', 60 * DAY, 90 * DAY)
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]['key'], f"bitcoin:hourly:{60 * DAY}:{90 * DAY}")
+        self.assertTrue(chunks[0]['complete'])
+
+
+class CheckpointTest(unittest.TestCase):
+
+    def test_chunk_finished_from_earlier_start_is_done(self):
+        earlier = backfill.plan_chunks('bitcoin', 'daily', 2 * YEAR + 50 * DAY, 3 * YEAR + DAY)[0]
+        later = backfill.plan_chunks('bitcoin', 'daily', 2 * YEAR + 80 * DAY, 3 * YEAR + DAY)[0]
+        starts = backfill.completed_starts({earlier['key']})
+
+        self.assertTrue(backfill.chunk_done(earlier, starts))
+        self.assertTrue(backfill.chunk_done(later, starts))
+
+    def test_chunk_finished_from_later_start_is_not_done(self):
+        earlier = backfill.plan_chunks('bitcoin', 'daily', 2 * YEAR + 50 * DAY, 3 * YEAR + DAY)[0]
+        later = backfill.plan_chunks('bitcoin', 'daily', 2 * YEAR + 80 * DAY, 3 * YEAR + DAY)[0]
+        starts = backfill.completed_starts({later['key']})
+
+        self.assertFalse(backfill.chunk_done(earlier, starts))
+
+    def test_other_coin_or_interval_is_not_done(self):
+        chunk = backfill.plan_chunks('bitcoin', 'daily', 2 * YEAR, 3 * YEAR + DAY)[0]
+        starts = backfill.completed_starts({f"ethereum:daily:{2 * YEAR}:{3 * YEAR}",
+                                            f"bitcoin:hourly:{2 * YEAR}:{3 * YEAR}"})
+        self.assertFalse(backfill.chunk_done(chunk, starts))
+
+    def test_coin_ids_with_colons_round_trip(self):
+        chunk = backfill.plan_chunks('odd:coin', 'daily', 2 * YEAR, 3 * YEAR + DAY)[0]
+        self.assertTrue(backfill.chunk_done(chunk, backfill.completed_starts({chunk['key']})))
+
+
+class MergeIntoStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        patcher = mock.patch.object(backfill, 'HISTORY_DIR', self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def chart(self, points):
+        return {
+            'prices': [[ts * 1000, price] for ts, price in points],
+            'market_caps': [[ts * 1000, price * 10] for ts, price in points],
+            'total_volumes': [[ts * 1000, 1.0] for ts, price in points],
+        }
+
+    def test_midnight_point_closes_previous_day(self):
+        backfill.merge_into_store('bitcoin', 'daily', self.chart([(10 * DAY, 100.0), (11 * DAY, 101.0)]))
+        history = backfill.load_history('bitcoin', 'daily')
+
+        self.assertEqual(history['timestamp'], [9 * DAY, 10 * DAY])
+        self.assertEqual(history['price'], [100.0, 101.0])
+        self.assertEqual(history['market_cap'], [1000.0, 1010.0])
+
+    def test_hourly_points_keep_last_one_of_the_day(self):
+        points = [(10 * DAY + h * HOUR, 100.0 + h) for h in range(1, 25)]
+        backfill.merge_into_store('bitcoin', 'daily', self.chart(points))
+        history = backfill.load_history('bitcoin', 'daily')
+
+        # 00:00 on day 11 is the last point of day 10, same as the daily feed
+        self.assertEqual(history['timestamp'], [10 * DAY])
+        self.assertEqual(history['price'], [124.0])
+        self.assertEqual(history['sampled_at'], [11 * DAY])
+
+    def test_later_sample_replaces_and_earlier_one_does_not(self):
+        backfill.merge_into_store('bitcoin', 'daily', self.chart([(10 * DAY + 12 * HOUR, 100.0)]))
+        backfill.merge_into_store('bitcoin', 'daily', self.chart([(10 * DAY + 18 * HOUR, 105.0)]))
+        backfill.merge_into_store('bitcoin', 'daily', self.chart([(10 * DAY + 6 * HOUR, 90.0)]))
+        history = backfill.load_history('bitcoin', 'daily')
+
+        self.assertEqual(history['timestamp'], [10 * DAY])
+        self.assertEqual(history['price'], [105.0])
+
+    def test_overlapping_downloads_do_not_duplicate_rows(self):
+        points = [(ts * DAY, 100.0 + ts) for ts in range(1, 6)]
+        backfill.merge_into_store('bitcoin', 'daily', self.chart(points[:4]))
+        backfill.merge_into_store('bitcoin', 'daily', self.chart(points[2:]))
+        history = backfill.load_history('bitcoin', 'daily')
+
+        self.assertEqual(history['timestamp'], [ts * DAY for ts in range(0, 5)])
+        self.assertEqual(history['price'], [101.0, 102.0, 103.0, 104.0, 105.0])
+
+    def test_missing_file_loads_empty_columns(self):
+        history = backfill.load_history('nothing', 'hourly')
+        self.assertEqual(history['timestamp'], [])
+        self.assertEqual(history['sampled_at'], [])
+
+
+class FetchTest(unittest.TestCase):
+
+    def test_universe_pages_keep_per_page_and_trim(self):
+        calls = []
+
+        def get(url, params=None, timeout=None):
+            calls.append(dict(params))
+            offset = (params['page'] - 1) * params['per_page']
+            response = mock.Mock()
+            response.json.return_value = [{'id': f"coin-{offset + i}"} for i in range(params['per_page'])]
+            return response
+
+        with mock.patch.object(backfill.requests, 'get', get):
+            coin_ids = backfill.fetch_universe(300)
+
+        self.assertEqual(len(coin_ids), 300)
+        self.assertEqual(len(set(coin_ids)), 300)
+        self.assertEqual([call['per_page'] for call in calls], [250, 250])
+
+    def test_retry_after_seconds_or_http_date(self):
+        self.assertEqual(backfill.retry_after_seconds('30'), 30)
+        self.assertEqual(backfill.retry_after_seconds(None), 60)
+        self.assertEqual(backfill.retry_after_seconds('soon'), 60)
+        self.assertAlmostEqual(backfill.retry_after_seconds(formatdate(time.time() + 120, usegmt=True)), 120, delta=2)
+        self.assertEqual(backfill.retry_after_seconds(formatdate(time.time() - 120, usegmt=True)), 0)
+
+    def test_rate_limit_with_http_date_backs_off_and_retries(self):
+        limited = mock.Mock(status_code=429, headers={'Retry-After': formatdate(time.time() + 5, usegmt=True)})
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {'prices': []}
+        limiter = mock.Mock()
+
+        with mock.patch.object(backfill.requests, 'get', side_effect=[limited, ok]):
+            chart = backfill.fetch_market_chart_range('bitcoin', 0, DAY, limiter)
+
+        self.assertEqual(chart, {'prices': []})
+        self.assertAlmostEqual(limiter.backoff.call_args[0][0], 5, delta=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
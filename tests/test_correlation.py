@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_v3_backfill as backfill
+import crypto_v3_correlation as correlation
+
+DAY = backfill.DAY
+
+
+class RefreshTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        patcher = mock.patch.object(backfill, 'HISTORY_DIR', self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.rng = np.random.default_rng(7)
+
+    def write_history(self, coin_id, prices):
+        """Daily closes ending yesterday"""
+        today = (int(time.time()) // DAY) * DAY
+        timestamps = [today - (len(prices) - i) * DAY for i in range(len(prices))]
+        os.makedirs(os.path.join(self.tmp, 'daily'), exist_ok=True)
+        with open(backfill.history_path(coin_id, 'daily'), 'w') as f:
+            json.dump({'timestamp': timestamps, 'price': list(prices), 'market_cap': [None] * len(prices),
+                       'total_volume': [None] * len(prices), 'sampled_at': timestamps}, f)
+
+    def walk(self, days=40):
+        return list(100 * np.exp(np.cumsum(self.rng.normal(0, 0.02, days))))
+
+    def test_backfilled_coin_is_picked_up_on_the_next_refresh(self):
+        coins = ['bitcoin', 'ethereum', 'solana']
+        self.write_history('bitcoin', self.walk())
+        self.write_history('ethereum', self.walk())
+
+        analytics = correlation.refresh_cross_asset(coins, window=30)
+        self.assertTrue(np.isnan(analytics['beta']['bitcoin'][2]))
+
+        # A later backfill fills in the missing coin
+        self.write_history('solana', self.walk())
+        analytics = correlation.refresh_cross_asset(coins, window=30)
+        self.assertFalse(np.isnan(analytics['beta']['bitcoin'][2]))
+        self.assertEqual([coin_id for coin_id, _ in analytics['relative_strength']].count('solana'), 1)
+
+    def test_matches_direct_numpy_correlation(self):
+        coins = ['bitcoin', 'ethereum']
+        btc, eth = self.walk(), self.walk()
+        self.write_history('bitcoin', btc)
+        self.write_history('ethereum', eth)
+
+        analytics = correlation.refresh_cross_asset(coins, window=30)
+        returns = np.diff(np.log([btc, eth]), axis=1)[:, -30:]
+        self.assertAlmostEqual(analytics['correlation'][0, 1], np.corrcoef(returns)[0, 1])
+
+
+class ReportTest(unittest.TestCase):
+
+    def analytics(self, coin_ids):
+        n = len(coin_ids)
+        return {
+            'coin_ids': coin_ids,
+            'correlation': np.full((n, n), 0.5),
+            'beta': {'bitcoin': np.ones(n)},
+            'relative_strength': [(coin_id, 0.1 * (n - i)) for i, coin_id in enumerate(coin_ids) if coin_id != 'bitcoin'],
+        }
+
+    def test_weakest_does_not_repeat_strongest(self):
+        report = correlation.format_cross_asset_report(self.analytics(['bitcoin', 'ethereum', 'solana']), top=5)
+        self.assertEqual(report.count('ethereum'), 1)
+        self.assertNotIn('Weakest', report)
+
+    def test_weakest_takes_the_rest_when_short(self):
+        coin_ids = ['bitcoin'] + [f"coin-{i}" for i in range(7)]
+        report = correlation.format_cross_asset_report(self.analytics(coin_ids), top=5)
+        weakest = report.split('*Weakest vs BTC:*')[1]
+        self.assertEqual([line.split()[0] for line in weakest.strip().splitlines()], ['coin-6', 'coin-5'])
+
+
+if __name__ == '__main__':
+    unittest.main()
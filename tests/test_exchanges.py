@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_v3_exchanges as exchanges
+
+
+class StubVenueTest(unittest.TestCase):
+    """Runs every adapter against the local stub servers, OKX delayed past the deadline"""
+
+    symbols = ['BTC', 'ETH', 'PEPE']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = []
+        cls.base_urls = {}
+        for venue in exchanges.ADAPTERS:
+            server, cls.base_urls[venue] = exchanges.serve_stub_exchange(
+                venue, cls.symbols, delay=3 if venue == 'okx' else 0)
+            cls.servers.append(server)
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.shutdown()
+
+    def test_slow_venue_is_dropped_at_deadline(self):
+        started = time.monotonic()
+        results = exchanges.fetch_all_venues(self.symbols, venues=list(exchanges.ADAPTERS),
+                                             deadline=1, base_urls=self.base_urls)
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 2)
+        self.assertEqual(sorted(results), ['binance', 'bybit', 'hyperliquid'])
+        for result in results.values():
+            self.assertEqual(sorted(result['tickers']), sorted(self.symbols))
+
+    def test_default_venues_are_spot_only(self):
+        results = exchanges.fetch_all_venues(self.symbols, deadline=1, base_urls=self.base_urls)
+        self.assertEqual(sorted(results), ['binance', 'bybit'])
+
+    def test_hyperliquid_maps_kpepe_to_pepe(self):
+        adapter = exchanges.HyperliquidAdapter(self.base_urls['hyperliquid'])
+        self.assertEqual(adapter.to_venue('PEPE'), 'kPEPE')
+        self.assertEqual(adapter.from_venue('kPEPE'), 'PEPE')
+
+        tickers = adapter.fetch_tickers(['PEPE'])
+        self.assertEqual(list(tickers), ['PEPE'])
+        self.assertEqual(tickers['PEPE']['venue'], 'hyperliquid')
+
+    def test_venue_pair_names(self):
+        self.assertEqual(exchanges.BinanceAdapter().to_venue('btc'), 'BTCUSDT')
+        self.assertEqual(exchanges.OkxAdapter().to_venue('btc'), 'BTC-USDT')
+        self.assertIsNone(exchanges.BinanceAdapter().from_venue('BTCEUR'))
+        self.assertIsNone(exchanges.OkxAdapter().from_venue('BTC-EUR'))
+
+    def test_process_exits_without_waiting_for_slow_venue(self):
+        script = (
+            "import crypto_v3_exchanges as x\n"
+            "_, url = x.serve_stub_exchange('okx', ['BTC'], delay=5)\n"
+            "x.fetch_all_venues(['BTC'], venues=['okx'], deadline=0.5, base_urls={'okx': url})\n"
+        )
+        started = time.monotonic()
+        subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True, capture_output=True, timeout=30)
+        self.assertLess(time.monotonic() - started, 3)
+
+
+class MergeMathTest(unittest.TestCase):
+
+    def ticker(self, venue, price, volume_quote, bid=None, ask=None):
+        return {'venue': venue, 'symbol': 'BTC', 'price': price, 'bid': bid, 'ask': ask,
+                'volume_base': volume_quote / price, 'volume_quote': volume_quote,
+                'change_pct': 0, 'timestamp': 0}
+
+    def book(self, bid_sizes, ask_sizes):
+        return {'venue': 'x', 'symbol': 'BTC', 'timestamp': 0,
+                'bids': [(100 - i, size) for i, size in enumerate(bid_sizes)],
+                'asks': [(101 + i, size) for i, size in enumerate(ask_sizes)]}
+
+    def test_book_imbalance_uses_top_levels(self):
+        self.assertAlmostEqual(exchanges.book_imbalance(self.book([3, 1], [1, 1])), 100 / 3)
+        # Levels past the 10th are ignored
+        self.assertAlmostEqual(exchanges.book_imbalance(self.book([1] * 10 + [50], [1] * 10)), 0)
+        self.assertEqual(exchanges.book_imbalance(self.book([], [])), 0)
+
+    def test_merge_vwap_best_quotes_and_weighted_imbalance(self):
+        results = {
+            'a': {'tickers': {'BTC': self.ticker('a', 100.0, 3000.0, bid=99.5, ask=100.5)},
+                  'books': {'BTC': self.book([3], [1])}},
+            'b': {'tickers': {'BTC': self.ticker('b', 104.0, 1000.0, bid=103.0, ask=None)},
+                  'books': {'BTC': self.book([1], [3])}},
+        }
+        entry = exchanges.merge_by_symbol(results)['BTC']
+
+        self.assertEqual(entry['volume_quote'], 4000.0)
+        self.assertAlmostEqual(entry['price'], (100 * 3000 + 104 * 1000) / 4000)
+        self.assertEqual(entry['best_bid'], 103.0)
+        self.assertEqual(entry['best_ask'], 100.5)
+        self.assertEqual(entry['volume_share'], {'a': 0.75, 'b': 0.25})
+        # +50% on a (weight 3000), -50% on b (weight 1000)
+        self.assertAlmostEqual(entry['book_imbalance'], 25.0)
+
+    def test_bad_ticker_field_skips_only_that_ticker(self):
+        adapter = exchanges.OkxAdapter()
+        adapter.get = lambda path, params=None: {'data': [
+            {'instId': 'BTC-USDT', 'last': '100', 'bidPx': '', 'askPx': '', 'vol24h': '1',
+             'volCcy24h': '100', 'open24h': '100', 'ts': '0'},
+            {'instId': 'ETH-USDT', 'last': '', 'bidPx': '1', 'askPx': '1', 'vol24h': '1',
+             'volCcy24h': '1', 'open24h': '1', 'ts': '0'},
+        ]}
+        tickers = adapter.fetch_tickers(['BTC', 'ETH'])
+        self.assertEqual(list(tickers), ['BTC'])
+        self.assertIsNone(tickers['BTC']['bid'])
+
+
+if __name__ == '__main__':
+    unittest.main()
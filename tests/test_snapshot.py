@@ -0,0 +1,91 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import crypto_v3_backfill as backfill
+import crypto_v3_snapshot as snapshot
+
+DAY = snapshot.DAY
+HOUR = 3600
+MONDAY = 20000 * DAY
+
+
+def coin(symbol, price, change=0.0):
+    return {'id': symbol.lower(), 'symbol': symbol.lower(), 'current_price': price,
+            'price_change_percentage_24h': change, 'total_volume': 1.0}
+
+
+class DeltaReportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        for patcher in (
+            mock.patch.object(snapshot, 'DATA_DIR', self.tmp),
+            mock.patch.object(snapshot, 'RUN_STATE_FILE', os.path.join(self.tmp, 'run_state.json')),
+            # No stored history, so RSI falls back to the approximation
+            mock.patch.object(backfill, 'HISTORY_DIR', self.tmp),
+            mock.patch.dict(os.environ, {'FULL_REPORT': ''}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.data = [coin(f"C{i}", 100.0 + i) for i in range(30)]
+        self.watchlist = ['C25']
+
+    def run_at(self, now, data=None):
+        with mock.patch.object(snapshot.time, 'time', return_value=now):
+            return snapshot.delta_report(data or self.data, self.watchlist)
+
+    def test_second_run_loads_saved_state_and_sends_delta(self):
+        full, message, state = self.run_at(MONDAY + 8 * HOUR)
+        self.assertTrue(full)
+        self.assertFalse(os.path.exists(snapshot.RUN_STATE_FILE))
+        snapshot.save_run_state(*state)
+
+        full, message, state = self.run_at(MONDAY + 9 * HOUR)
+        self.assertFalse(full)
+        self.assertIsNone(message)
+
+    def test_unsent_full_report_is_due_again(self):
+        self.run_at(MONDAY + 8 * HOUR)
+        # Send failed, so nothing was saved
+        full, _, _ = self.run_at(MONDAY + 9 * HOUR)
+        self.assertTrue(full)
+
+    def test_full_report_once_per_day_from_the_slot(self):
+        snapshot.save_run_state(*self.run_at(MONDAY + 8 * HOUR)[2])
+        self.assertFalse(self.run_at(MONDAY + 23 * HOUR)[0])
+        self.assertFalse(self.run_at(MONDAY + DAY + 7 * HOUR)[0])
+        self.assertTrue(self.run_at(MONDAY + DAY + 8 * HOUR)[0])
+        # A late run still gets the day's digest
+        self.assertTrue(self.run_at(MONDAY + DAY + 11 * HOUR)[0])
+
+    def test_full_report_env_only_forces_on_truthy_values(self):
+        snapshot.save_run_state(*self.run_at(MONDAY + 8 * HOUR)[2])
+        with mock.patch.dict(os.environ, {'FULL_REPORT': '0'}):
+            self.assertFalse(self.run_at(MONDAY + 9 * HOUR)[0])
+        with mock.patch.dict(os.environ, {'FULL_REPORT': 'true'}):
+            self.assertTrue(self.run_at(MONDAY + 9 * HOUR)[0])
+
+    def test_delta_reports_watchlist_move_and_skips_missing_price(self):
+        snapshot.save_run_state(*self.run_at(MONDAY + 8 * HOUR)[2])
+        moved = [dict(c) for c in self.data]
+        moved[25]['current_price'] *= 1.05
+        full, message, state = self.run_at(MONDAY + 9 * HOUR, moved)
+        self.assertFalse(full)
+        self.assertIn('C25', message)
+        snapshot.save_run_state(*state)
+
+        moved[25]['current_price'] = None
+        full, message, _ = self.run_at(MONDAY + 10 * HOUR, moved)
+        self.assertIsNone(message)
+
+
+if __name__ == '__main__':
+    unittest.main()